@@ -0,0 +1,31 @@
+'''
+times loading graph files with readGraph and reports the throughput in edges/second
+usage: python benchmark.py [file ...]
+'''
+import sys
+import time
+
+from external_functions import readGraph
+
+
+def benchmarkLoad(filename, repeats = 3):
+    '''
+    loads the given file several times and returns the number of edges and the best loading time in seconds
+    '''
+    bestTime = None
+    numberOfEdges = 0
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        graph = readGraph(filename)
+        elapsed = time.perf_counter() - start
+        numberOfEdges = graph.NumberOfEdges
+        if bestTime is None or elapsed < bestTime:
+            bestTime = elapsed
+    return numberOfEdges, bestTime
+
+
+if __name__ == "__main__":
+    filenames = sys.argv[1:] or ["graph_read.txt"]
+    for filename in filenames:
+        numberOfEdges, seconds = benchmarkLoad(filename)
+        print(filename + ": " + str(numberOfEdges) + " edges in " + "{:.3f}".format(seconds) + " s, " + "{:.0f}".format(numberOfEdges / seconds) + " edges/second")
@@ -1,70 +1,139 @@
-from graph import Graph
-import random
+from graph import Graph, FrozenGraph
+from generators import gnmGraph
+import mmap
+import struct
+import sys
 
-def readGraph(filename):
+def readGraph(filename, chunkSize = 1 << 20):
     '''
     the information about a graph is read from a given textfile and the graph is created
+    the file is read in chunks of about chunkSize bytes and every chunk is inserted with one bulk operation
     '''
     try:
         with open(filename, "r") as file:
-            lines = file.readlines()
-            lines[0] = lines[0].strip("\n")
-            graphVerticesAndEdges = lines[0].split(" ")
+            graphVerticesAndEdges = file.readline().split()
             numberOfVertices = int(graphVerticesAndEdges[0])
             numberOfEdges = int(graphVerticesAndEdges[1])
             graph = Graph(numberOfVertices, numberOfEdges)
-            lines = lines[1:]
-            for line in lines:
-                line = line.strip("\n")
-                edge = line.split(" ")
-                vertex1 = int(edge[0])
-                vertex2 = int(edge[1])
-                cost = int(edge[2])
-                graph.addEdge(vertex1, vertex2, cost)
+            lines = file.readlines(chunkSize)
+            while lines:
+                values = list(map(int, "".join(lines).split()))
+                if len(values) % 3 != 0:
+                    raise ValueError("Every edge must have two vertices and a cost")
+                graph.addEdgesBulk(zip(values[0::3], values[1::3], values[2::3]))
+                lines = file.readlines(chunkSize)
     except:
         raise ValueError("File not found")
     return graph
 
+def _compacted(graph):
+    '''
+    returns the graph itself, or a compacted copy of it if it has removed vertex ids (stable ids mode), because the text
+    format needs the vertices to be 0..n-1
+    '''
+    if not graph._tombstones:
+        return graph
+    graph = Graph.copyGraph(graph)
+    graph.compact()
+    return graph
+
 def writeGraph(graph, filename):
     '''
     writes the info of a graph to a given file
+    a graph with removed vertex ids is written compacted, the graph itself keeps its ids
     '''
+    graph = _compacted(graph)
     with open(filename, "w+") as file:
         numberOfVertices = graph.NumberOfVertices
         numberOfEdges = graph.NumberOfEdges
         file.write(str(numberOfVertices) + " " + str(numberOfEdges) + "\n")
-        for vertex1 in graph.VerticesOutboundEdges:
-            for vertex2 in graph.VerticesOutboundEdges[vertex1]:
-                file.write(str(vertex1) + " " + str(vertex2) + " " + str(graph.Costs[(vertex1, vertex2)]) + "\n")
+        outboundEdges = graph.VerticesOutboundEdges
+        costs = graph.Costs
+        for vertex1 in outboundEdges:
+            for vertex2 in outboundEdges[vertex1]:
+                file.write(str(vertex1) + " " + str(vertex2) + " " + str(costs[(vertex1, vertex2)]) + "\n")
+
+_BINARY_MAGIC = b"GRPH"
+_BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct("<4sHHqq") #magic, version, 1 if the arrays are little endian, number of vertex ids, number of edges
+_BINARY_ALIGNMENT = 8
+
+
+def writeGraphBinary(graph, filename):
+    '''
+    writes a graph (or a frozen graph) to a binary file: a header followed by the compressed sparse row arrays of the
+    outbound and inbound edges (int64 offsets, int32 neighbours, int64 costs), each array aligned to 8 bytes
+    '''
+    if isinstance(graph, Graph):
+        graph = graph.freeze()
+    sections = graph.sections()
+    with open(filename, "wb") as file:
+        file.write(_BINARY_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION, sys.byteorder == "little", len(sections[0]), graph.NumberOfEdges))
+        for section in sections:
+            data = memoryview(section).cast("B")
+            file.write(data)
+            file.write(bytes(-data.nbytes % _BINARY_ALIGNMENT))
+
+
+def readGraphBinary(filename):
+    '''
+    memory-maps a file written by writeGraphBinary and returns a FrozenGraph whose arrays point directly into the file,
+    so nothing is parsed and the neighbours are only read from disk when they are accessed
+    '''
+    try:
+        with open(filename, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        raise ValueError("File not found")
+    if len(data) < _BINARY_HEADER.size:
+        raise ValueError("The file is not a binary graph file")
+    magic, version, littleEndian, size, numberOfEdges = _BINARY_HEADER.unpack_from(data, 0)
+    if magic != _BINARY_MAGIC or version != _BINARY_VERSION:
+        raise ValueError("The file is not a binary graph file")
+    if littleEndian != (sys.byteorder == "little"):
+        raise ValueError("The file was written on a machine with a different byte order")
+
+    view = memoryview(data)
+    sections = []
+    position = _BINARY_HEADER.size
+    for typecode, length in (("B", size), ("q", size + 1), ("i", numberOfEdges), ("q", numberOfEdges), ("q", size + 1), ("i", numberOfEdges), ("q", numberOfEdges)):
+        nbytes = length * struct.calcsize(typecode)
+        if position + nbytes > len(data):
+            raise ValueError("The binary graph file is truncated")
+        sections.append(view[position:position + nbytes].cast(typecode))
+        position += nbytes + (-nbytes % _BINARY_ALIGNMENT)
+    return FrozenGraph(*sections)
+
+
+def convertGraphToBinary(textFilename, binaryFilename):
+    '''
+    converts a graph from the "n m / x y c" text format to the binary format
+    '''
+    writeGraphBinary(readGraph(textFilename), binaryFilename)
+
 
 def writeGraphConsole(graph):
     '''
     writes the info of a graph to the console
+    a graph with removed vertex ids is written compacted, like writeGraph does
     '''
+    graph = _compacted(graph)
     numberOfVertices = graph.NumberOfVertices
     numberOfEdges = graph.NumberOfEdges
     print(str(numberOfVertices) + " " + str(numberOfEdges) + "\n")
-    for vertex1 in graph.VerticesOutboundEdges:
-        if graph.VerticesOutboundEdges[vertex1] == []:
+    outboundEdges = graph.VerticesOutboundEdges
+    costs = graph.Costs
+    for vertex1 in outboundEdges:
+        neighbours = outboundEdges[vertex1]
+        if len(neighbours) == 0:
             print(str(vertex1) + " has no outbound edges\n")
-        for vertex2 in graph.VerticesOutboundEdges[vertex1]:
-            print(str(vertex1) + " " + str(vertex2) + " " + str(graph.Costs[(vertex1, vertex2)]) + "\n")
+        for vertex2 in neighbours:
+            print(str(vertex1) + " " + str(vertex2) + " " + str(costs[(vertex1, vertex2)]) + "\n")
 
 
-def randomGraph(numberOfVertices, numberOfEdges):
+def randomGraph(numberOfVertices, numberOfEdges, seed = None):
     '''
     generates a random graph with a given number of vertices and a given number of edges
     '''
-    graph = Graph(numberOfVertices, numberOfEdges)
-    for vertex in range(numberOfVertices):
-        graph.addVertex(vertex)
-    numberOfAddedEdges = 1
-    while numberOfAddedEdges <= numberOfEdges:
-        vertex1 = random.choice(range(numberOfVertices))
-        vertex2 = random.choice(range(numberOfVertices))
-        cost = random.choice(range(1000))
-        if not graph.findEdgeBetweenVertices(vertex1, vertex2):
-            graph.addEdge(vertex1, vertex2, cost)
-            numberOfAddedEdges += 1
-    return graph
+    return gnmGraph(numberOfVertices, numberOfEdges, seed)
 
@@ -0,0 +1,106 @@
+'''
+seeded random graph generators that sample all the edges at once and build the graph through Graph.addEdgesBulk
+'''
+import random
+from bisect import bisect
+
+from graph import Graph
+
+
+def _buildGraph(numberOfVertices, sources, targets, costs):
+    graph = Graph(numberOfVertices)
+    graph.addEdgesBulk(zip(sources, targets, costs))
+    return graph
+
+
+def gnmGraph(numberOfVertices, numberOfEdges, seed = None, maximumCost = 1000):
+    '''
+    generates a uniform random graph with exactly numberOfEdges distinct edges (self loops allowed) and costs in
+    [0, maximumCost); the edges are sampled without replacement as indices into the numberOfVertices^2 possible pairs
+    '''
+    if numberOfVertices < 0 or numberOfEdges < 0:
+        raise ValueError("The number of vertices and edges must be >=0")
+    if numberOfEdges > numberOfVertices * numberOfVertices:
+        raise ValueError("The number of edges is at most numberOfVertices^2")
+    generator = random.Random(seed)
+    indices = generator.sample(range(numberOfVertices * numberOfVertices), numberOfEdges)
+    sources = [index // numberOfVertices for index in indices]
+    targets = [index % numberOfVertices for index in indices]
+    costs = [generator.randrange(maximumCost) for index in indices]
+    return _buildGraph(numberOfVertices, sources, targets, costs)
+
+
+def _rmatTable(probabilities, levels):
+    '''
+    returns the cumulative weights of all the 4^levels sequences of quadrants, together with the source and target bits
+    selected by every sequence, so that several levels of the recursion are drawn with one random number
+    '''
+    outcomes = [(1.0, 0, 0)]
+    for level in range(levels):
+        outcomes = [(weight * probabilities[quadrant], (source << 1) | (quadrant >> 1), (target << 1) | (quadrant & 1)) for weight, source, target in outcomes for quadrant in range(4)]
+    cumulative = []
+    total = 0
+    for weight, source, target in outcomes:
+        total += weight
+        cumulative.append(total)
+    return cumulative, [outcome[1] for outcome in outcomes], [outcome[2] for outcome in outcomes]
+
+
+def rmatGraph(numberOfVertices, numberOfEdges, seed = None, maximumCost = 1000, probabilities = (0.57, 0.19, 0.19, 0.05)):
+    '''
+    generates a graph with a power-law degree distribution using the R-MAT model: every edge is placed by descending
+    into one of the four quadrants of the adjacency matrix, with the given probabilities, once for every bit of the
+    vertex ids; duplicate edges and vertices out of range are drawn again
+    suited for sparse graphs, the rejection gets slow when numberOfEdges approaches numberOfVertices^2
+    '''
+    if numberOfVertices < 0 or numberOfEdges < 0:
+        raise ValueError("The number of vertices and edges must be >=0")
+    if numberOfEdges > numberOfVertices * numberOfVertices:
+        raise ValueError("The number of edges is at most numberOfVertices^2")
+    generator = random.Random(seed)
+    levels = max(1, (numberOfVertices - 1).bit_length())
+    chunks = [min(4, levels - start) for start in range(0, levels, 4)]
+    tables = {chunk: _rmatTable(probabilities, chunk) for chunk in set(chunks)}
+    sources = []
+    targets = []
+    seen = set()
+    while len(sources) < numberOfEdges:
+        for edge in range(numberOfEdges - len(sources)):
+            source = 0
+            target = 0
+            for chunk in chunks:
+                cumulative, sourceBits, targetBits = tables[chunk]
+                outcome = bisect(cumulative, generator.random() * cumulative[-1])
+                if outcome == len(cumulative):
+                    outcome -= 1
+                source = (source << chunk) | sourceBits[outcome]
+                target = (target << chunk) | targetBits[outcome]
+            if source < numberOfVertices and target < numberOfVertices and (source, target) not in seen:
+                seen.add((source, target))
+                sources.append(source)
+                targets.append(target)
+    costs = [generator.randrange(maximumCost) for source in sources]
+    return _buildGraph(numberOfVertices, sources, targets, costs)
+
+
+def gridGraph(rows, columns, seed = None, maximumCost = 1000):
+    '''
+    generates a rows x columns grid where vertex row * columns + column has edges in both directions to its right and
+    lower neighbours, with random costs in [0, maximumCost)
+    '''
+    if rows < 0 or columns < 0:
+        raise ValueError("The number of rows and columns must be >=0")
+    generator = random.Random(seed)
+    sources = []
+    targets = []
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            if column + 1 < columns:
+                sources.extend((vertex, vertex + 1))
+                targets.extend((vertex + 1, vertex))
+            if row + 1 < rows:
+                sources.extend((vertex, vertex + columns))
+                targets.extend((vertex + columns, vertex))
+    costs = [generator.randrange(maximumCost) for source in sources]
+    return _buildGraph(rows * columns, sources, targets, costs)
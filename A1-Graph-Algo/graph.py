@@ -1,26 +1,86 @@
-import copy
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from types import MappingProxyType
+
+
+class _AdjacencyView(Mapping):
+    '''
+    live read-only view over an adjacency dictionary, the neighbours of a vertex are given as a tuple
+    '''
+
+    def __init__(self, adjacency):
+        self._adjacency = adjacency
+
+    def __getitem__(self, vertex):
+        return tuple(self._adjacency[vertex])
+
+    def __iter__(self):
+        return iter(self._adjacency)
+
+    def __len__(self):
+        return len(self._adjacency)
+
+
+class _NeighbourSet(dict):
+    '''
+    insertion-ordered set of neighbours offering the list methods used by Graph, with O(1) membership, append and remove
+    '''
+
+    def __init__(self, neighbours = ()):
+        super().__init__(dict.fromkeys(neighbours))
+
+    def append(self, vertex):
+        self[vertex] = None
+
+    def remove(self, vertex):
+        del self[vertex]
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+_ADJACENCY_TYPES = {"list": list, "set": _NeighbourSet}
+
 
 class Graph(object):
 
-    def __init__(self, numberOfVertices = 0, numberOfEdges = 0):
+    def __init__(self, numberOfVertices = 0, numberOfEdges = 0, stableIds = False, adjacency = "list"):
+        if adjacency not in _ADJACENCY_TYPES:
+            raise ValueError("The adjacency must be one of " + ", ".join(_ADJACENCY_TYPES))
         self._numberOfVertices = numberOfVertices
         self._numberOfEdges = numberOfEdges
         self._verticesInboundEdges = {} #key = vertex, value = a list of the vertices from which the inbound edges come
         self._verticesOutboundEdges = {} #key = vertex, value = a list of the vertices to which the outbound edges go
         self._costs = {} #key = tuple in/out vertices  of edge, value = cost
+        self._stableIds = stableIds #if True, removing a vertex does not renumber the others until compact() is called
+        self._tombstones = set() #ids of removed vertices that were not renumbered yet
+        self._neighbours = _ADJACENCY_TYPES[adjacency] #"list" keeps plain lists, "set" gives O(1) edge checks and removals
+        self._inDegrees = array("q", bytes(8 * max(numberOfVertices, 0))) #index = vertex, value = in degree
+        self._outDegrees = array("q", bytes(8 * max(numberOfVertices, 0))) #index = vertex, value = out degree
+        self._sharesLists = False #set by copyGraph, the neighbour lists may then be shared with another graph
+        self._ownedInbound = set() #vertices whose inbound list this graph may modify in place while sharing lists
+        self._ownedOutbound = set() #vertices whose outbound list this graph may modify in place while sharing lists
+        self._ownsCosts = True #False while the costs dictionary is shared with another graph
 
         for vertex in range(self._numberOfVertices):
-            self._verticesInboundEdges.update({vertex: []})
-            self._verticesOutboundEdges.update({vertex: []})
+            self._verticesInboundEdges.update({vertex: self._neighbours()})
+            self._verticesOutboundEdges.update({vertex: self._neighbours()})
 
     @property
     def VerticesInboundEdges(self):
-        return copy.deepcopy(self._verticesInboundEdges)
+        '''
+        read-only view of the inbound adjacency, reflects later changes of the graph without copying it
+        '''
+        return _AdjacencyView(self._verticesInboundEdges)
 
 
     @property
     def VerticesOutboundEdges(self):
-        return copy.deepcopy(self._verticesOutboundEdges)
+        '''
+        read-only view of the outbound adjacency, reflects later changes of the graph without copying it
+        '''
+        return _AdjacencyView(self._verticesOutboundEdges)
 
     @property
     def NumberOfVertices(self):
@@ -31,7 +91,10 @@ class Graph(object):
         return self._numberOfEdges
     @property
     def Costs(self):
-        return copy.deepcopy(self._costs)
+        '''
+        read-only view of the costs dictionary
+        '''
+        return MappingProxyType(self._costs)
 
     def _updateVerticesAndEdges(self):
         '''
@@ -40,6 +103,54 @@ class Graph(object):
         self._numberOfVertices = len(self._verticesInboundEdges)
         self._numberOfEdges = len(self._costs)
 
+    def _writableInbound(self, vertex):
+        '''
+        returns the inbound list of vertex, copying it first if it may be shared with another graph
+        '''
+        if self._sharesLists and vertex not in self._ownedInbound:
+            self._verticesInboundEdges[vertex] = self._neighbours(self._verticesInboundEdges[vertex])
+            self._ownedInbound.add(vertex)
+        return self._verticesInboundEdges[vertex]
+
+    def _writableOutbound(self, vertex):
+        '''
+        returns the outbound list of vertex, copying it first if it may be shared with another graph
+        '''
+        if self._sharesLists and vertex not in self._ownedOutbound:
+            self._verticesOutboundEdges[vertex] = self._neighbours(self._verticesOutboundEdges[vertex])
+            self._ownedOutbound.add(vertex)
+        return self._verticesOutboundEdges[vertex]
+
+    def _writableCosts(self):
+        '''
+        returns the costs dictionary, copying it first if it is shared with another graph
+        '''
+        if not self._ownsCosts:
+            self._costs = dict(self._costs)
+            self._ownsCosts = True
+        return self._costs
+
+    def _reserveDegrees(self, vertex):
+        '''
+        makes the degree arrays long enough to hold the given vertex
+        '''
+        missing = vertex + 1 - len(self._inDegrees)
+        if missing > 0:
+            self._inDegrees.frombytes(bytes(8 * missing))
+            self._outDegrees.frombytes(bytes(8 * missing))
+
+    def _rebuildDegrees(self):
+        '''
+        recomputes the degree arrays from the adjacency dictionaries
+        '''
+        size = max(list(self._verticesInboundEdges) + list(self._verticesOutboundEdges), default=-1) + 1
+        self._inDegrees = array("q", bytes(8 * size))
+        self._outDegrees = array("q", bytes(8 * size))
+        for vertex, neighbours in self._verticesInboundEdges.items():
+            self._inDegrees[vertex] = len(neighbours)
+        for vertex, neighbours in self._verticesOutboundEdges.items():
+            self._outDegrees[vertex] = len(neighbours)
+
     def findVertex(self, givenVertex):
         '''
         searches for vertex in the graph
@@ -53,146 +164,170 @@ class Graph(object):
         '''
         adds vertex to graph
         '''
-        if vertex > self._numberOfVertices:
+        if vertex > self._numberOfVertices + len(self._tombstones):
             raise ValueError("Vertices must be consecutive positive numbers")
         if self.findVertex(vertex):
             return False
-        self._verticesInboundEdges.update({vertex: []})
-        self._verticesOutboundEdges.update({vertex: []})
+        self._tombstones.discard(vertex)
+        self._verticesInboundEdges.update({vertex: self._neighbours()})
+        self._verticesOutboundEdges.update({vertex: self._neighbours()})
+        if self._sharesLists:
+            self._ownedInbound.add(vertex)
+            self._ownedOutbound.add(vertex)
+        self._reserveDegrees(vertex)
         self._updateVerticesAndEdges()
         return True
 
+    def _removeIncidentEdges(self, givenVertex):
+        '''
+        removes the edges of a vertex and marks its id as removed, the other vertices keep their ids
+        '''
+        costs = self._writableCosts()
+        for vertex in self._verticesInboundEdges.pop(givenVertex):
+            if vertex != givenVertex:
+                self._writableOutbound(vertex).remove(givenVertex)
+                self._outDegrees[vertex] -= 1
+            del costs[(vertex, givenVertex)]
+        for vertex in self._verticesOutboundEdges.pop(givenVertex, []):
+            if vertex != givenVertex:
+                self._writableInbound(vertex).remove(givenVertex)
+                self._inDegrees[vertex] -= 1
+                del costs[(givenVertex, vertex)]
+        self._ownedInbound.discard(givenVertex)
+        self._ownedOutbound.discard(givenVertex)
+        self._inDegrees[givenVertex] = 0
+        self._outDegrees[givenVertex] = 0
+        self._tombstones.add(givenVertex)
+
     def removeVertex(self, givenVertex):
         '''
         removes vertex and associated edges from graph, as well as the costs of the edges
+        unless the graph keeps stable ids, the vertices greater than the removed one are renumbered
         '''
-        if givenVertex in self._verticesInboundEdges:
-            associatedInVertices = self._verticesInboundEdges[givenVertex]
-            associatedOutVertices = self._verticesOutboundEdges[givenVertex]
-        else:
+        if givenVertex not in self._verticesInboundEdges:
             return False
-        del self._verticesInboundEdges[givenVertex]
-        del self._verticesOutboundEdges[givenVertex]
-
-        for vertex in associatedInVertices:
-            self._verticesOutboundEdges[vertex].remove(givenVertex)
-
-        for vertex in associatedOutVertices:
-            self._verticesInboundEdges[vertex].remove(givenVertex)
-
-
-        updatedEdges = [] # list of tuples (vertex1, vertex2, cost) to update
-        deletedEdges = [] # list of edges to delete
-        for edge in self._costs:
-            if edge[0] == givenVertex or edge[1] == givenVertex:
-                deletedEdges.append(edge)
-            else:
-                vertex1 = edge[0]
-                vertex2 = edge[1]
-                cost = self._costs[edge]
-                changed = False
-                if vertex1 > givenVertex:
-                    vertex1 -= 1
-                    changed = True
-                if vertex2 > givenVertex:
-                    vertex2 -= 1
-                    changed = True
-                if changed:
-                    deletedEdges.append((edge[0], edge[1]))
-                    updatedEdges.append((vertex1, vertex2, cost))
-        #delete edges
-        for edge in deletedEdges:
-            del self._costs[edge]
-        #update edges
-        for edge in updatedEdges:
-            vertex1 = edge[0]
-            vertex2 = edge[1]
-            cost = edge[2]
-            self._costs.update({(vertex1, vertex2): cost})
-
-        #update inbound edges dictionary - decrease vertices value
-        updatedEdges = [] #tuples vertex, list of inbound edges
-        deletedEdges = [] #vertices to remove from dictionaries (as keys)
-        for vertex in self._verticesInboundEdges:
-            modified = False
-            newVertex = vertex
-            updatedListOfInbounds = copy.deepcopy(self._verticesInboundEdges[vertex])
-            for index in range(len(updatedListOfInbounds)):
-                if updatedListOfInbounds[index] > givenVertex:
-                    updatedListOfInbounds[index] -= 1
-                    modified = True
-            if vertex > givenVertex:
-                newVertex = vertex - 1
-                modified = True
-            if modified:
-                deletedEdges.append(vertex)
-                updatedEdges.append((newVertex, updatedListOfInbounds))
-        #delete
-        for vertex in deletedEdges:
-            del self._verticesInboundEdges[vertex]
-        #update
-        for vertex in updatedEdges:
-            self._verticesInboundEdges.update({vertex[0]: vertex[1]})
-
-        # update outbound edges dictionary - same as the outbound edges
-        updatedEdges = []  # tuples vertex, list of inbound edges
-        deletedEdges = []  # vertices to remove from dictionaries (as keys)
-        for vertex in self._verticesOutboundEdges:
-            modified = False
-            newVertex = vertex
-            updatedListOfOutbounds = copy.deepcopy(self._verticesOutboundEdges[vertex])
-            for index in range(len(updatedListOfOutbounds)):
-                if updatedListOfOutbounds[index] > givenVertex:
-                    updatedListOfOutbounds[index] -= 1
-                    modified = True
-            if vertex > givenVertex:
-                newVertex = vertex - 1
-                modified = True
-            if modified:
-                deletedEdges.append(vertex)
-                updatedEdges.append((newVertex, updatedListOfOutbounds))
-        # delete
-        for vertex in deletedEdges:
-            del self._verticesOutboundEdges[vertex]
-        # update
-        for vertex in updatedEdges:
-            self._verticesOutboundEdges.update({vertex[0]: vertex[1]})
-
+        self._removeIncidentEdges(givenVertex)
+        if not self._stableIds:
+            self.compact()
         self._updateVerticesAndEdges()
         return True
 
+    def removeVertices(self, vertices):
+        '''
+        removes all the given vertices (ids taken before any renumbering) and renumbers the rest once for the whole batch
+        returns the number of removed vertices
+        '''
+        removed = 0
+        for vertex in vertices:
+            if vertex in self._verticesInboundEdges:
+                self._removeIncidentEdges(vertex)
+                removed += 1
+        if not self._stableIds:
+            self.compact()
+        self._updateVerticesAndEdges()
+        return removed
+
+    def compact(self):
+        '''
+        renumbers the vertices in one pass so that the ids of removed vertices are reused
+        every vertex is decreased by the number of removed ids smaller than it
+        '''
+        if not self._tombstones:
+            return
+        removed = sorted(self._tombstones)
+
+        def renumber(vertex):
+            return vertex - bisect_left(removed, vertex)
+
+        for adjacency in (self._verticesInboundEdges, self._verticesOutboundEdges):
+            renumbered = {}
+            for vertex in sorted(adjacency):
+                renumbered[renumber(vertex)] = self._neighbours(renumber(neighbour) for neighbour in adjacency[vertex])
+            adjacency.clear()
+            adjacency.update(renumbered)
+        renumbered = {(renumber(edge[0]), renumber(edge[1])): cost for edge, cost in self._costs.items()}
+        costs = self._writableCosts()
+        costs.clear()
+        costs.update(renumbered)
+        #every neighbour list was rebuilt, so none of them is shared any more
+        self._sharesLists = False
+        self._ownedInbound.clear()
+        self._ownedOutbound.clear()
+        self._tombstones.clear()
+        self._rebuildDegrees()
+        self._updateVerticesAndEdges()
+
     def addEdge(self, vertex1, vertex2, cost):
         '''
         adds edge going from vertex1 to vertex2 to the graph
         '''
-        if (vertex1 > self._numberOfVertices or vertex2 > self._numberOfVertices or vertex1 < 0 or vertex2 < 0) and not ((vertex1 == self._numberOfVertices and vertex2 == vertex1 + 1) or (vertex2 == self._numberOfVertices and vertex1 == vertex2 + 1)):
+        numberOfIds = self._numberOfVertices + len(self._tombstones)
+        if (vertex1 > numberOfIds or vertex2 > numberOfIds or vertex1 < 0 or vertex2 < 0) and not ((vertex1 == numberOfIds and vertex2 == vertex1 + 1) or (vertex2 == numberOfIds and vertex1 == vertex2 + 1)):
             raise ValueError("The vertices must be consecutive positive numbers")
+        if vertex1 in self._tombstones or vertex2 in self._tombstones:
+            raise ValueError("The vertex was removed from the graph")
         if vertex1 not in self._verticesOutboundEdges:
-            self._verticesOutboundEdges.update({vertex1: [vertex2]})
+            self._verticesOutboundEdges.update({vertex1: self._neighbours([vertex2])})
         if vertex2 not in self._verticesInboundEdges:
-            self._verticesInboundEdges.update({vertex2: [vertex1]})
+            self._verticesInboundEdges.update({vertex2: self._neighbours([vertex1])})
 
         if vertex2 not in self._verticesOutboundEdges[vertex1]:
-            self._verticesOutboundEdges[vertex1].append(vertex2)
+            self._writableOutbound(vertex1).append(vertex2)
         if vertex1 not in self._verticesInboundEdges[vertex2]:
-            self._verticesInboundEdges[vertex2].append(vertex1)
+            self._writableInbound(vertex2).append(vertex1)
 
         if (vertex1, vertex2) in self._costs:
-            self._costs[(vertex1, vertex2)] = cost
+            self._writableCosts()[(vertex1, vertex2)] = cost
         else:
-            self._costs.update({(vertex1, vertex2): cost})
+            self._writableCosts().update({(vertex1, vertex2): cost})
+            self._reserveDegrees(max(vertex1, vertex2))
+            self._outDegrees[vertex1] += 1
+            self._inDegrees[vertex2] += 1
 
         self._updateVerticesAndEdges()
 
+    def addEdgesBulk(self, edges):
+        '''
+        adds or modifies a batch of edges given as (vertex1, vertex2, cost) tuples
+        all the edges are validated before any of them is inserted, so their vertices must already be in the graph
+        returns the number of edges in the batch
+        '''
+        edges = list(edges)
+        inbound = self._verticesInboundEdges
+        outbound = self._verticesOutboundEdges
+        sources = {edge[0] for edge in edges}
+        targets = {edge[1] for edge in edges}
+        if not outbound.keys() >= sources or not inbound.keys() >= targets:
+            raise ValueError("The vertices of the edges must already be in the graph")
+        if self._sharesLists:
+            for vertex in sources:
+                self._writableOutbound(vertex)
+            for vertex in targets:
+                self._writableInbound(vertex)
+        costs = self._writableCosts()
+        inDegrees = self._inDegrees
+        outDegrees = self._outDegrees
+        for vertex1, vertex2, cost in edges:
+            if (vertex1, vertex2) not in costs:
+                outbound[vertex1].append(vertex2)
+                inbound[vertex2].append(vertex1)
+                outDegrees[vertex1] += 1
+                inDegrees[vertex2] += 1
+            costs[(vertex1, vertex2)] = cost
+        self._updateVerticesAndEdges()
+        return len(edges)
+
     def removeEdge(self, vertex1, vertex2):
         '''
         removes edge from vertex1 to vertex2
         '''
         keyToSearch = (vertex1, vertex2)
         if keyToSearch in self._costs:
-            del self._costs[keyToSearch]
-            self._verticesInboundEdges[vertex2].remove(vertex1)
-            self._verticesOutboundEdges[vertex1].remove(vertex2)
+            del self._writableCosts()[keyToSearch]
+            self._writableInbound(vertex2).remove(vertex1)
+            self._writableOutbound(vertex1).remove(vertex2)
+            self._inDegrees[vertex2] -= 1
+            self._outDegrees[vertex1] -= 1
             self._updateVerticesAndEdges()
             return True
         return False
@@ -205,6 +340,30 @@ class Graph(object):
             return self._costs[(vertex1, vertex2)]
         return None
 
+    def findEdgesBetweenVertices(self, pairs):
+        '''
+        looks up a batch of (vertex1, vertex2) pairs
+        returns a bytearray with 1 for the pairs that are edges and an array with their costs (0 for the missing edges)
+        '''
+        found = [self._costs.get((vertex1, vertex2)) for vertex1, vertex2 in pairs]
+        return bytearray(cost is not None for cost in found), array("q", [0 if cost is None else cost for cost in found])
+
+    def _gatherDegrees(self, degrees, vertices):
+        present = self._verticesInboundEdges
+        return array("q", [degrees[vertex] if vertex in present else -1 for vertex in vertices])
+
+    def inDegrees(self, vertices):
+        '''
+        gets the in degrees of a batch of vertices as an array, -1 for the vertices that are not in the graph
+        '''
+        return self._gatherDegrees(self._inDegrees, vertices)
+
+    def outDegrees(self, vertices):
+        '''
+        gets the out degrees of a batch of vertices as an array, -1 for the vertices that are not in the graph
+        '''
+        return self._gatherDegrees(self._outDegrees, vertices)
+
     def inDegree(self, vertex):
         '''
         gets the in degree of the given vertex
@@ -246,12 +405,217 @@ class Graph(object):
         returns all the vertices of the graph
         '''
         v=[]
-        for vertex in range(self._numberOfVertices):
-            v.append(vertex)
+        for vertex in range(self._numberOfVertices + len(self._tombstones)):
+            if vertex not in self._tombstones:
+                v.append(vertex)
         return v
     @staticmethod
     def copyGraph(graph):
         '''
-        creates a deep copy of the graph
+        creates a copy of the graph that shares the neighbour lists and the costs with it
+        a list (or the costs dictionary) is duplicated by whichever of the two graphs modifies it first
+        '''
+        newGraph = Graph.__new__(Graph)
+        newGraph.__dict__.update(graph.__dict__)
+        newGraph._verticesInboundEdges = dict(graph._verticesInboundEdges)
+        newGraph._verticesOutboundEdges = dict(graph._verticesOutboundEdges)
+        newGraph._tombstones = set(graph._tombstones)
+        newGraph._inDegrees = array("q", graph._inDegrees)
+        newGraph._outDegrees = array("q", graph._outDegrees)
+        for owner in (graph, newGraph):
+            owner._sharesLists = True
+            owner._ownedInbound = set()
+            owner._ownedOutbound = set()
+            owner._ownsCosts = False
+        return newGraph
+
+    def freeze(self):
+        '''
+        builds a read-only compressed sparse row snapshot of the graph
+        '''
+        vertices = list(self._verticesInboundEdges)
+        for vertex in self._verticesOutboundEdges:
+            if vertex not in self._verticesInboundEdges:
+                vertices.append(vertex)
+        for vertex in vertices:
+            if not isinstance(vertex, int) or vertex < 0:
+                raise ValueError("Vertices must be consecutive positive numbers")
+        size = max(vertices) + 1 if vertices else 0
+        present = bytearray(size)
+        for vertex in vertices:
+            present[vertex] = 1
+
+        outOffsets, outTargets, outCosts = FrozenGraph.buildRows(self._verticesOutboundEdges, size, lambda vertex, neighbour: self._costs[(vertex, neighbour)])
+        inOffsets, inSources, inCosts = FrozenGraph.buildRows(self._verticesInboundEdges, size, lambda vertex, neighbour: self._costs[(neighbour, vertex)])
+        return FrozenGraph(present, outOffsets, outTargets, outCosts, inOffsets, inSources, inCosts)
+
+
+class FrozenGraph(object):
+    '''
+    read-only snapshot of a Graph stored in compressed sparse row form
+    the neighbours of vertex v are targets[offsets[v]:offsets[v + 1]], sorted increasingly, and the cost of each of them
+    is found at the same position in costs; both directions (outbound and inbound) are stored
+    '''
+
+    def __init__(self, present, outOffsets, outTargets, outCosts, inOffsets, inSources, inCosts):
+        self._present = present
+        self._outOffsets = outOffsets
+        self._outTargets = memoryview(outTargets)
+        self._outCosts = memoryview(outCosts)
+        self._inOffsets = inOffsets
+        self._inSources = memoryview(inSources)
+        self._inCosts = memoryview(inCosts)
+        self._numberOfVertices = sum(present)
+        self._numberOfEdges = len(self._outTargets)
+
+    @staticmethod
+    def buildRows(adjacency, size, costOf):
+        '''
+        builds the offsets/neighbours/costs arrays of one direction from an adjacency dictionary
+        '''
+        offsets = array("q", [0])
+        neighbours = array("i")
+        costs = array("q")
+        for vertex in range(size):
+            row = sorted(adjacency.get(vertex, ()))
+            neighbours.extend(row)
+            costs.extend(costOf(vertex, neighbour) for neighbour in row)
+            offsets.append(len(neighbours))
+        return offsets, neighbours, costs
+
+    @property
+    def NumberOfVertices(self):
+        return self._numberOfVertices
+
+    @property
+    def NumberOfEdges(self):
+        return self._numberOfEdges
+
+    def findVertex(self, givenVertex):
+        '''
+        searches for vertex in the graph
+        '''
+        return 0 <= givenVertex < len(self._present) and self._present[givenVertex] == 1
+
+    def _row(self, offsets, vertex):
+        if not self.findVertex(vertex):
+            return None
+        return offsets[vertex], offsets[vertex + 1]
+
+    def findEdgeBetweenVertices(self, vertex1, vertex2):
+        '''
+        searches for edge between two given vertices, binary searching the outbound row of vertex1
+        '''
+        row = self._row(self._outOffsets, vertex1)
+        if row is None:
+            return None
+        position = bisect_left(self._outTargets, vertex2, row[0], row[1])
+        if position < row[1] and self._outTargets[position] == vertex2:
+            return self._outCosts[position]
+        return None
+
+    def inDegree(self, vertex):
+        '''
+        gets the in degree of the given vertex
+        '''
+        row = self._row(self._inOffsets, vertex)
+        if row is None:
+            return None
+        return row[1] - row[0]
+
+    def outDegree(self, vertex):
+        '''
+        gets the out degree of the given vertex
+        '''
+        row = self._row(self._outOffsets, vertex)
+        if row is None:
+            return None
+        return row[1] - row[0]
+
+    def parseInbound(self, vertex):
+        '''
+        returns the inbound edges of a vertex as a read-only view
+        '''
+        row = self._row(self._inOffsets, vertex)
+        if row is None:
+            return None
+        return self._inSources[row[0]:row[1]]
+
+    def parseOutbound(self, vertex):
+        '''
+        returns outbound edges of a vertex as a read-only view
+        '''
+        row = self._row(self._outOffsets, vertex)
+        if row is None:
+            return None
+        return self._outTargets[row[0]:row[1]]
+
+    def parseInboundCosts(self, vertex):
+        '''
+        returns the costs of the inbound edges of a vertex, in the same order as parseInbound
+        '''
+        row = self._row(self._inOffsets, vertex)
+        if row is None:
+            return None
+        return self._inCosts[row[0]:row[1]]
+
+    def parseOutboundCosts(self, vertex):
+        '''
+        returns the costs of the outbound edges of a vertex, in the same order as parseOutbound
+        '''
+        row = self._row(self._outOffsets, vertex)
+        if row is None:
+            return None
+        return self._outCosts[row[0]:row[1]]
+
+    def parseVertices(self):
+        '''
+        returns all the vertices of the graph
+        '''
+        return [vertex for vertex in range(len(self._present)) if self._present[vertex]]
+
+    def findEdgesBetweenVertices(self, pairs):
+        '''
+        looks up a batch of (vertex1, vertex2) pairs
+        returns a bytearray with 1 for the pairs that are edges and an array with their costs (0 for the missing edges)
+        '''
+        found = [self.findEdgeBetweenVertices(vertex1, vertex2) for vertex1, vertex2 in pairs]
+        return bytearray(cost is not None for cost in found), array("q", [0 if cost is None else cost for cost in found])
+
+    def _gatherDegrees(self, offsets, vertices):
+        return array("q", [offsets[vertex + 1] - offsets[vertex] if self.findVertex(vertex) else -1 for vertex in vertices])
+
+    def inDegrees(self, vertices):
+        '''
+        gets the in degrees of a batch of vertices as an array, -1 for the vertices that are not in the graph
+        '''
+        return self._gatherDegrees(self._inOffsets, vertices)
+
+    def outDegrees(self, vertices):
+        '''
+        gets the out degrees of a batch of vertices as an array, -1 for the vertices that are not in the graph
+        '''
+        return self._gatherDegrees(self._outOffsets, vertices)
+
+    def sections(self):
+        '''
+        returns the arrays of the snapshot in the order expected by the constructor
+        '''
+        return (self._present, self._outOffsets, self._outTargets, self._outCosts, self._inOffsets, self._inSources, self._inCosts)
+
+    def thaw(self):
+        '''
+        creates a new mutable Graph with the same vertices, edges and costs
+        if some ids are absent, the graph keeps stable ids, so that the vertices keep the ids they have in the snapshot
         '''
-        return copy.deepcopy(graph)
\ No newline at end of file
+        tombstones = {vertex for vertex in range(len(self._present)) if not self._present[vertex]}
+        graph = Graph(stableIds = bool(tombstones))
+        for vertex in self.parseVertices():
+            graph._verticesInboundEdges[vertex] = list(self.parseInbound(vertex))
+            graph._verticesOutboundEdges[vertex] = list(self.parseOutbound(vertex))
+            for neighbour, cost in zip(self.parseOutbound(vertex), self.parseOutboundCosts(vertex)):
+                graph._costs[(vertex, neighbour)] = cost
+        graph._tombstones = tombstones
+        graph._rebuildDegrees()
+        graph._updateVerticesAndEdges()
+        return graph
\ No newline at end of file
@@ -0,0 +1,194 @@
+'''
+incremental persistence of a graph: a checkpoint file in the text format of writeGraph and an append-only journal with
+the operations performed since that checkpoint, so that saving an edit costs O(1) I/O instead of rewriting the file
+'''
+import os
+import zlib
+
+from external_functions import readGraph, writeGraph
+from graph import Graph
+
+
+def _checksum(filename):
+    '''
+    computes the crc32 of a file, used to tie a journal to the checkpoint it continues
+    '''
+    checksum = 0
+    with open(filename, "rb") as file:
+        chunk = file.read(1 << 20)
+        while chunk:
+            checksum = zlib.crc32(chunk, checksum)
+            chunk = file.read(1 << 20)
+    return checksum
+
+
+def _applyOperation(graph, fields):
+    '''
+    applies one journal line, already split into fields, to the graph
+    '''
+    operation = fields[0]
+    values = [int(field) for field in fields[1:]]
+    if operation == "av" and len(values) == 1:
+        graph.addVertex(values[0])
+    elif operation == "rv" and len(values) == 1:
+        graph.removeVertex(values[0])
+    elif operation == "ae" and len(values) == 3:
+        graph.addEdge(values[0], values[1], values[2])
+    elif operation == "re" and len(values) == 2:
+        graph.removeEdge(values[0], values[1])
+    else:
+        raise ValueError("Unknown journal operation")
+
+
+def _header(graph, checksum):
+    '''
+    the first line of a journal: the checksum of its checkpoint and, for a graph with stable ids or with removed ids, the
+    ids of the removed vertices that the compacted checkpoint leaves out
+    the removed ids are recorded whenever writeGraph compacts the checkpoint, so the journal lines, which use the ids
+    of the live graph, are always replayed on the same ids
+    '''
+    fields = ["checkpoint", str(checksum)]
+    if graph._stableIds or graph._tombstones:
+        fields.append("stable")
+        fields.extend(str(vertex) for vertex in sorted(graph._tombstones))
+    return " ".join(fields) + "\n"
+
+
+def _withStableIds(graph, tombstones):
+    '''
+    rebuilds a graph read from a compacted checkpoint with the stable ids it had when the checkpoint was written:
+    the removed ids are marked as removed again and every vertex gets back the id it had before compacting
+    '''
+    stableGraph = Graph(graph.NumberOfVertices + len(tombstones), 0, stableIds = True)
+    for vertex in tombstones:
+        stableGraph.removeVertex(vertex)
+    ids = stableGraph.parseVertices()
+    costs = graph.Costs
+    stableGraph.addEdgesBulk((ids[edge[0]], ids[edge[1]], costs[edge]) for edge in costs)
+    return stableGraph
+
+
+def _replay(filename):
+    '''
+    reads the checkpoint and replays its journal
+    returns the graph, the number of replayed operations and whether the journal can be appended to as it is
+    a journal written for an older checkpoint is ignored, and so is an incomplete last line left by a crash
+    '''
+    graph = readGraph(filename)
+    try:
+        journal = open(filename + ".journal", "r")
+    except FileNotFoundError:
+        return graph, 0, False
+    replayed = 0
+    with journal:
+        header = journal.readline().split()
+        if header[:2] != ["checkpoint", str(_checksum(filename))]:
+            return graph, 0, False
+        if header[2:3] == ["stable"]:
+            #the operations were recorded with the stable ids, so they are replayed on a graph that keeps them
+            graph = _withStableIds(graph, [int(vertex) for vertex in header[3:]])
+        for line in journal:
+            if not line.endswith("\n"):
+                return graph, replayed, False
+            _applyOperation(graph, line.split())
+            replayed += 1
+    return graph, replayed, True
+
+
+def loadJournaledGraph(filename):
+    '''
+    loads a graph saved by a GraphJournal: the checkpoint file followed by the operations of its journal
+    '''
+    return _replay(filename)[0]
+
+
+class GraphJournal(object):
+    '''
+    performs the mutating operations of a graph and records each of them in the journal file (filename + ".journal")
+    every checkpointInterval operations the whole graph is written to filename and the journal is started again
+    '''
+
+    def __init__(self, graph, filename, checkpointInterval = 10000):
+        self._graph = graph
+        self._filename = filename
+        self._journalFilename = filename + ".journal"
+        self._checkpointInterval = checkpointInterval
+        self._operationsSinceCheckpoint = 0
+        self._journal = None
+        self.checkpoint()
+
+    @staticmethod
+    def open(filename, checkpointInterval = 10000):
+        '''
+        continues the journal of a graph saved before, a new checkpoint is only written if the journal was incomplete
+        '''
+        journal = GraphJournal.__new__(GraphJournal)
+        journal._graph, journal._operationsSinceCheckpoint, appendable = _replay(filename)
+        journal._filename = filename
+        journal._journalFilename = filename + ".journal"
+        journal._checkpointInterval = checkpointInterval
+        journal._journal = None
+        if appendable:
+            journal._journal = open(journal._journalFilename, "a")
+        else:
+            journal.checkpoint()
+        return journal
+
+    @property
+    def Graph(self):
+        return self._graph
+
+    def checkpoint(self):
+        '''
+        writes the whole graph to the checkpoint file and starts an empty journal for it
+        the text format needs consecutive vertices, so writeGraph writes a graph with removed ids from a compacted copy
+        (the graph itself keeps its ids) and the journal header lists the removed ids
+        both files are replaced atomically, and a journal left over from the previous checkpoint is recognised by its
+        checksum, so a crash at any point leaves a consistent checkpoint + journal pair
+        '''
+        if self._journal is not None:
+            self._journal.close()
+        writeGraph(self._graph, self._filename + ".tmp")
+        os.replace(self._filename + ".tmp", self._filename)
+        with open(self._journalFilename + ".tmp", "w") as journal:
+            journal.write(_header(self._graph, _checksum(self._filename)))
+        os.replace(self._journalFilename + ".tmp", self._journalFilename)
+        self._journal = open(self._journalFilename, "a")
+        self._operationsSinceCheckpoint = 0
+
+    def _record(self, line):
+        self._journal.write(line + "\n")
+        self._journal.flush()
+        self._operationsSinceCheckpoint += 1
+        if self._operationsSinceCheckpoint >= self._checkpointInterval:
+            self.checkpoint()
+
+    def addVertex(self, vertex):
+        added = self._graph.addVertex(vertex)
+        if added:
+            self._record("av " + str(vertex))
+        return added
+
+    def removeVertex(self, vertex):
+        removed = self._graph.removeVertex(vertex)
+        if removed:
+            self._record("rv " + str(vertex))
+        return removed
+
+    def addEdge(self, vertex1, vertex2, cost):
+        self._graph.addEdge(vertex1, vertex2, cost)
+        self._record("ae " + str(vertex1) + " " + str(vertex2) + " " + str(cost))
+
+    def removeEdge(self, vertex1, vertex2):
+        removed = self._graph.removeEdge(vertex1, vertex2)
+        if removed:
+            self._record("re " + str(vertex1) + " " + str(vertex2))
+        return removed
+
+    def close(self):
+        '''
+        closes the journal file, the graph can be loaded again with loadJournaledGraph or GraphJournal.open
+        '''
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
@@ -0,0 +1,123 @@
+"""
+All-pairs lowest cost walks for DirectedGraph, using Johnson's algorithm: one Bellman-Ford pass from a virtual vertex
+computes a potential h for every vertex, the costs are reweighted to cost(x, y) + h[x] - h[y] (which is never
+negative), and then one Dijkstra search is run from every source. The searches are independent, so they are spread
+over a process pool; every worker receives the read-only snapshot of the graph once, through the pool initializer.
+"""
+import math
+import os
+from collections import deque
+from heapq import heappush, heappop
+from multiprocessing import Pool
+
+from exceptions import NegativeCycleError
+
+# the snapshot of the graph used by the searches of the current process, set by _initialize_worker
+_snapshot = None
+
+
+def make_snapshot(G):
+    """
+    Builds the read-only snapshot used by the searches: the vertices, the potentials and, for every vertex, the list of
+    (neighbour index, reweighted cost) pairs. Vertices are replaced by their positions in the list of vertices.
+    Runtime: O(V*E) in the worst case when the graph has negative costs, O(V+E) otherwise
+    :param G: DirectedGraph object
+    :return: a tuple (vertices, potential, rows) that can be sent to other processes
+    :raises NegativeCycleError: if the graph contains a negative cost cycle
+    """
+    vertices = G.parse_vertices()
+    index = {vertex: position for position, vertex in enumerate(vertices)}
+    rows = [[(index[y], G.costs[(x, y)]) for y in G.parse_outbound(x)] for x in vertices]
+
+    potential = _potential(rows)
+    if any(potential):
+        rows = [[(y, cost + potential[x] - potential[y]) for y, cost in row] for x, row in enumerate(rows)]
+    return vertices, potential, rows
+
+
+def _potential(rows):
+    # queue-based Bellman-Ford from a virtual vertex with a 0 cost edge towards every vertex, so every vertex starts
+    # at distance 0 and in the queue; graphs without negative costs keep the potential 0 everywhere
+    potential = [0] * len(rows)
+    if not any(cost < 0 for row in rows for _, cost in row):
+        return potential
+    queue = deque(range(len(rows)))
+    in_queue = [True] * len(rows)
+    queued = [1] * len(rows)
+    while queue:
+        x = queue.popleft()
+        in_queue[x] = False
+        for y, cost in rows[x]:
+            if potential[x] + cost < potential[y]:
+                potential[y] = potential[x] + cost
+                if not in_queue[y]:
+                    queued[y] += 1
+                    # the virtual vertex makes it V + 1 vertices, so a vertex is queued at most V times per run
+                    if queued[y] > len(rows):
+                        raise NegativeCycleError
+                    in_queue[y] = True
+                    queue.append(y)
+    return potential
+
+
+def _initialize_worker(snapshot):
+    global _snapshot
+    _snapshot = snapshot
+
+
+def _search(source):
+    # Dijkstra on the reweighted costs; the real cost of a walk is recovered from the potentials of its ends
+    vertices, potential, rows = _snapshot
+    distance = {source: 0}
+    done = set()
+    heap = [(0, source)]
+    while heap:
+        cost, x = heappop(heap)
+        if x in done:
+            continue
+        done.add(x)
+        for y, edge_cost in rows[x]:
+            new_cost = cost + edge_cost
+            if new_cost < distance.get(y, math.inf):
+                distance[y] = new_cost
+                heappush(heap, (new_cost, y))
+    return vertices[source], [(vertices[y], cost - potential[source] + potential[y]) for y, cost in distance.items()]
+
+
+def all_pairs_lowest_cost(G, processes=None, file_path=None, chunk_size=16):
+    """
+    Computes the lowest cost of a walk between every pair of vertices with Johnson's algorithm.
+    Runtime: O(V*E*log(V)) after the reweighting, divided between the worker processes
+    :param G: DirectedGraph object
+    :param processes: the number of worker processes (None for one per processor, 1 to search in this process)
+    :param file_path: if given, the rows are written to this file as "source target cost" lines as soon as they are
+    computed, instead of being kept in memory
+    :param chunk_size: the number of sources sent to a worker at once
+    :return: a dictionary source -> (dictionary target -> cost) holding only the reachable targets, or the number of
+    rows written when file_path is given
+    :raises NegativeCycleError: if the graph contains a negative cost cycle
+    """
+    snapshot = make_snapshot(G)
+    sources = range(len(snapshot[0]))
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes == 1 or len(sources) < 2 * chunk_size:
+        _initialize_worker(snapshot)
+        try:
+            return _collect(map(_search, sources), file_path)
+        finally:
+            _initialize_worker(None)
+    with Pool(processes, initializer=_initialize_worker, initargs=(snapshot,)) as pool:
+        return _collect(pool.imap_unordered(_search, sources, chunk_size), file_path)
+
+
+def _collect(results, file_path):
+    if file_path is None:
+        return {source: dict(row) for source, row in results}
+    rows = 0
+    with open(file_path, "w") as f:
+        for source, row in results:
+            f.writelines(f"{source} {target} {cost}\n" for target, cost in row)
+            rows += 1
+    return rows
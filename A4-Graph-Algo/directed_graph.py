@@ -1,6 +1,6 @@
 from collections import deque
-from copy import deepcopy
 
+import instrumentation
 from exceptions import VertexError, NonexistentVertexError, EdgeError, NonexistentEdgeError
 
 
@@ -10,8 +10,8 @@ class DirectedGraph:
     """
 
     def __init__(self, vertices, edges):
-        self.__vertices = []
-        self.__edges = []
+        # the keys of __outbound (and __inbound) are the vertices and the keys of __costs are the edges, both kept in
+        # insertion order; membership tests are O(1) and the dictionaries are the single source of truth
         self.__costs = {}
         self.__outbound = {}
         self.__inbound = {}
@@ -20,6 +20,11 @@ class DirectedGraph:
         self.__earliest_end = [-999999] * len(vertices)  # the earliest time when activity i ends
         self.__latest_start = [999999] * len(vertices)  # the time at the latest when activity i begins
         self.__latest_end = [999999] * len(vertices)  # the time at the latest when activity i ends
+        # copy() shares the containers between the two graphs; a shared container is duplicated before the first write
+        self.__shares_lists = False  # True once the inbound/outbound lists may be shared with another graph
+        self.__owned_outbound = set()  # vertices whose outbound list may be modified in place while sharing lists
+        self.__owned_inbound = set()  # vertices whose inbound list may be modified in place while sharing lists
+        self.__owns_costs = True
 
         for vertex in vertices:
             self.add_vertex(vertex)
@@ -33,17 +38,17 @@ class DirectedGraph:
 
     @property
     def edges(self):
-        return self.__edges
+        return self.__costs.keys()
 
     @property
     def costs(self):
         return self.__costs
 
     def get_number_of_vertices(self):
-        return len(self.__vertices)
+        return len(self.__outbound)
 
     def get_number_of_edges(self):
-        return len(self.__edges)
+        return len(self.__costs)
 
     def set_duration(self, times):
         self.__duration = times
@@ -53,10 +58,10 @@ class DirectedGraph:
     """
 
     def parse_vertices(self):
-        return [vertex for vertex in self.__vertices]
+        return list(self.__outbound)
 
     def parse_edges(self):
-        return [edge for edge in self.__edges]
+        return list(self.__costs)
 
     def parse_inbound(self, x):
         return [y for y in self.__inbound[x]]
@@ -64,6 +69,35 @@ class DirectedGraph:
     def parse_outbound(self, x):
         return [y for y in self.__outbound[x]]
 
+    """
+    COPY-ON-WRITE
+    """
+
+    def __writable_outbound(self, x):
+        if self.__shares_lists and x not in self.__owned_outbound:
+            self.__outbound[x] = list(self.__outbound[x])
+            self.__owned_outbound.add(x)
+        return self.__outbound[x]
+
+    def __writable_inbound(self, x):
+        if self.__shares_lists and x not in self.__owned_inbound:
+            self.__inbound[x] = list(self.__inbound[x])
+            self.__owned_inbound.add(x)
+        return self.__inbound[x]
+
+    def __writable_costs(self):
+        if not self.__owns_costs:
+            self.__costs = dict(self.__costs)
+            self.__owns_costs = True
+        return self.__costs
+
+    def __new_vertex(self, x):
+        self.__outbound[x] = []
+        self.__inbound[x] = []
+        if self.__shares_lists:
+            self.__owned_outbound.add(x)
+            self.__owned_inbound.add(x)
+
     """
     FUNCTIONALITIES
     """
@@ -71,14 +105,12 @@ class DirectedGraph:
     def add_vertex(self, x):
         """
         Adds a vertex to the graph. If the vertex already exists in the graph, VertexError will be raised.
-        Runtime: O(V), where V is the number of vertices (because of validation)
+        Runtime: O(1)
         :param x: integer (vertex)
         """
-        if x in self.parse_vertices():
+        if x in self.__outbound:
             raise VertexError
-        self.__vertices.append(x)
-        self.__outbound[x] = []
-        self.__inbound[x] = []
+        self.__new_vertex(x)
 
     def add_vertex_valid(self, x):
         """
@@ -86,46 +118,64 @@ class DirectedGraph:
         Runtime: O(1)
         :param x: integer (vertex)
         """
-        self.__vertices.append(x)
-        self.__outbound[x] = []
-        self.__inbound[x] = []
+        self.__new_vertex(x)
 
     def remove_vertex(self, x):
         """
         Removes a vertex from the graph. All edges containing x as the origin or target vertex, The outbound and inbound
-        lists of x will be deleted (using self.remove_edge()). If x is not a vertex, an error will be raised.
-        Runtime: O(max(V, E)), where V is the number of vertices and E the number of edges
+        lists of x will be deleted. If x is not a vertex, an error will be raised.
+        Runtime: O(deg(x) * max deg), where deg(i) = the degree of vertex i
         :param x: integer (vertex)
         """
-        if x not in self.parse_vertices():
+        if x not in self.__outbound:
             raise NonexistentVertexError
 
-        for edge in self.parse_edges():
-            if edge[0] == x or edge[1] == x:
-                self.remove_edge(edge[0], edge[1])
-        del self.__outbound[x]
-        del self.__inbound[x]
-        self.__vertices.remove(x)
+        self.remove_vertices([x])
+
+    def remove_vertices(self, vertices):
+        """
+        Removes several vertices and all the edges containing them. The edges are found through the outbound and inbound
+        lists of the removed vertices. If one of the given vertices is not in the graph, an error is raised and nothing
+        is removed.
+        Runtime: O(sum(deg(x) * max deg)), where deg(x) is the degree of a removed vertex x
+        :param vertices: iterable of vertices
+        """
+        removed = set(vertices)
+        if not all(x in self.__outbound for x in removed):
+            raise NonexistentVertexError
+
+        costs = self.__writable_costs()
+        for x in removed:
+            for y in self.__outbound.pop(x):
+                del costs[(x, y)]
+                if y not in removed:
+                    self.__writable_inbound(y).remove(x)
+            for y in self.__inbound.pop(x):
+                # an edge between two removed vertices was deleted with the outbound list of its origin
+                if y not in removed:
+                    del costs[(y, x)]
+                    self.__writable_outbound(y).remove(x)
+            self.__owned_outbound.discard(x)
+            self.__owned_inbound.discard(x)
 
     def add_edge(self, x, y, c):
         """
         Adds an edge to the graph. If x or y are not vertices or the edge already exists in the graph, an error will be
         raised.
-        Runtime: O(max(V, E)), where V is the number of vertices and E the number of edges (because of validation)
+        Runtime: O(1)
         :param x: integer (vertex)
         :param y: integer (vertex)
         :param c: integer
         """
-        if x not in self.parse_vertices():
+        if x not in self.__outbound:
             raise NonexistentVertexError
-        if y not in self.parse_vertices():
+        if y not in self.__outbound:
             raise NonexistentVertexError
-        if (x, y) in self.parse_edges():
+        if (x, y) in self.__costs:
             raise EdgeError
-        self.__edges.append((x, y))
-        self.__outbound[x].append(y)
-        self.__inbound[y].append(x)
-        self.__costs[(x, y)] = c
+        self.__writable_outbound(x).append(y)
+        self.__writable_inbound(y).append(x)
+        self.__writable_costs()[(x, y)] = c
 
     def add_edge_valid(self, x, y, c):
         """
@@ -136,31 +186,29 @@ class DirectedGraph:
         :param y: integer (vertex)
         :param c: integer
         """
-        self.__edges.append((x, y))
-        self.__outbound[x].append(y)
-        self.__inbound[y].append(x)
-        self.__costs[(x, y)] = c
+        self.__writable_outbound(x).append(y)
+        self.__writable_inbound(y).append(x)
+        self.__writable_costs()[(x, y)] = c
 
     def remove_edge(self, x, y):
         """
         Removes a given edge from the graph. Its cost, y as the outbound of x and x as the inbound of y will be deleted.
         If x or y are not vertices or (x, y) is not an edge, an error will be raised.
-        Runtime: O(E), where E is the number of edges
+        Runtime: O(deg(x) + deg(y)), where deg(i) = the degree of vertex i
         :param x:
         :param y:
         :return:
         """
-        if x not in self.parse_vertices():
+        if x not in self.__outbound:
             raise NonexistentVertexError
-        if y not in self.parse_vertices():
+        if y not in self.__outbound:
             raise NonexistentVertexError
-        if (x, y) not in self.parse_edges():
+        if (x, y) not in self.__costs:
             raise NonexistentEdgeError
 
-        self.__edges.remove((x, y))
-        del self.__costs[(x, y)]
-        self.__outbound[x].remove(y)
-        self.__inbound[y].remove(x)
+        del self.__writable_costs()[(x, y)]
+        self.__writable_outbound(x).remove(y)
+        self.__writable_inbound(y).remove(x)
 
     def update_edge(self, x, y, new_cost):
         """
@@ -170,32 +218,30 @@ class DirectedGraph:
         :param y: integer (vertex)
         :param new_cost: integer
         """
-        if x not in self.parse_vertices():
+        if x not in self.__outbound:
             raise NonexistentVertexError
-        if y not in self.parse_vertices():
+        if y not in self.__outbound:
             raise NonexistentVertexError
-        if (x, y) not in self.parse_edges():
+        if (x, y) not in self.__costs:
             raise NonexistentEdgeError
 
-        self.__costs[(x, y)] = new_cost
+        self.__writable_costs()[(x, y)] = new_cost
 
     def is_edge(self, x, y):
         """
         Checks if there is an edge in the graph that has the origin x and the target y (returns True if it finds the
         given edge, False otherwise). If x or y are not vertices, an error is raised.
-        Runtime: O(deg(x) + deg(y)), where deg(i) = the degree of vertex i
+        Runtime: O(1)
         :param x: integer (vertex)
         :param y: integer (vertex)
         :return: boolean
         """
-        if x not in self.parse_vertices():
+        if x not in self.__outbound:
             raise NonexistentVertexError
-        if y not in self.parse_vertices():
+        if y not in self.__outbound:
             raise NonexistentVertexError
 
-        if y in self.__outbound[x] and x in self.__inbound[y]:
-            return True
-        return False
+        return (x, y) in self.__costs
 
     def in_degree(self, x):
         """
@@ -204,7 +250,7 @@ class DirectedGraph:
         :param x: integer (vertex)
         :return: integer
         """
-        if x not in self.parse_vertices():
+        if x not in self.__outbound:
             raise NonexistentVertexError
 
         return len(self.__inbound[x])
@@ -216,19 +262,30 @@ class DirectedGraph:
         :param x: integer (vertex)
         :return: integer
         """
-        if x not in self.parse_vertices():
+        if x not in self.__outbound:
             raise NonexistentVertexError
 
         return len(self.__outbound[x])
 
     def copy(self):
         """
-        Returns a deepcopy of the graph.
-        Runtime: O(1)
+        Returns a copy of the graph that shares its lists and its costs with this graph. Whichever of the two graphs
+        modifies a shared list (or the costs) first works on its own duplicate of it, so unchanged parts stay shared.
+        Runtime: O(V), where V is the number of vertices
         :return: DirectedGraph object
         """
-        return deepcopy(self)
-
+        graph = DirectedGraph.__new__(DirectedGraph)
+        graph.__dict__.update(self.__dict__)
+        graph.__outbound = dict(self.__outbound)
+        graph.__inbound = dict(self.__inbound)
+        for owner in (self, graph):
+            owner.__shares_lists = True
+            owner.__owned_outbound = set()
+            owner.__owned_inbound = set()
+            owner.__owns_costs = False
+        return graph
+
+    @instrumentation.timed("topological_sorting")
     def topological_sorting(self):
         """
         Checks if the corresponding graph is a DAG and performs a topological sorting of the
@@ -250,19 +307,26 @@ class DirectedGraph:
             if counter[vertex] == 0:
                 Q.append(vertex)
 
+        relaxations = 0
         while len(Q) != 0:
             vertex = Q.popleft()
             sorted_vertices.append(vertex)
-            for neighbour in self.parse_outbound(vertex):
+            outbound = self.parse_outbound(vertex)
+            relaxations += len(outbound)
+            for neighbour in outbound:
                 counter[neighbour] -= 1
                 if counter[neighbour] == 0:
                     Q.append(neighbour)
+        # every sorted vertex was pushed and expanded exactly once
+        instrumentation.count("topological_sorting", expansions=len(sorted_vertices), relaxations=relaxations,
+                              pushes=len(sorted_vertices))
 
         if len(sorted_vertices) < self.get_number_of_vertices():
             sorted_vertices = []
 
         return sorted_vertices
 
+    @instrumentation.timed("get_times")
     def get_times(self):
         """
         Finds the earliest and the latest starting time for each activity and the total time of the project.
@@ -297,6 +361,10 @@ class DirectedGraph:
                 self.__latest_end[vertex] = min(self.__latest_end[vertex], self.__latest_start[neighbour])
             self.__latest_start[vertex] = self.__latest_end[vertex] - self.__duration[vertex]
 
+        # both passes expand every sorted vertex and examine its inbound, then its outbound edges
+        instrumentation.count("get_times", expansions=2 * len(sorted_vertices),
+                              relaxations=2 * self.get_number_of_edges() if sorted_vertices else 0)
+
         if not sorted_vertices:
             return -1, -1, -1, -1, -1
         return self.__earliest_start, self.__earliest_end, self.__latest_start, self.__latest_end, self.__latest_end[
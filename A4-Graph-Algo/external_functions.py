@@ -1,49 +1,50 @@
 import math
-from random import randrange
+from array import array
+from collections import deque
+from random import Random
 
+import instrumentation
+import relaxation
 from directed_graph import DirectedGraph
-from exceptions import InvalidEdges
+from exceptions import InvalidEdges, NegativeCycleError, NonexistentVertexError
 
 
-def generate_random_graph(n, m, file_path):
+def generate_random_graph(n, m, file_path, seed=None):
     """
     Function that generates a random graph with a given number of vertices and edges. The cost will be an integer from
-    the interval [0, 1.000.000]. If the number of edges is invalid an error will be raised. The graph will be written in
-    the text file having the path file_path.
+    the interval [-1.000.000, 1.000.000). If the number of edges is invalid an error will be raised. The m distinct
+    edges are drawn at once with random.sample over the n^2 (x, y) pairs, added with the unchecked add_edge_valid, and
+    the graph is written in the text file having the path file_path in large buffered blocks as it is generated.
+    Runtime: O(n + m)
     :param file_path: path of the file in which the graph will be saved
     :param n: integer (number of vertices)
     :param m: integer (number of edges)
+    :param seed: optional seed, the same seed always gives the same graph
     :return: DirectedGraph object
     """
     if m > n ** 2:
         raise InvalidEdges
 
-    vertices = []
+    generator = Random(seed)
+    G = DirectedGraph([], [])
     for i in range(n):
-        vertices.append(str(i))
+        G.add_vertex_valid(str(i))
 
-    edges = []
-    while len(edges) < m:
-        x = randrange(n)
-        y = randrange(n)
-        cost = randrange(-1000000, 1000000)
+    with open(file_path, "w", buffering=1 << 20) as f:
+        f.write(f"{n} {m}\n")
 
-        ok = 1
-        for edge in edges:
-            if edge[0] == x and edge[1] == y:
-                ok *= -1
+        lines = []
+        for pair in generator.sample(range(n * n), m):
+            x, y = divmod(pair, n)
+            cost = generator.randrange(-1000000, 1000000)
+            G.add_edge_valid(str(x), str(y), cost)
+            lines.append(f"{x} {y} {cost}\n")
+            if len(lines) == 65536:
+                f.writelines(lines)
+                lines.clear()
+        f.writelines(lines)
 
-        if ok == 1:
-            edges.append((x, y, cost))
-
-    G = DirectedGraph(vertices, edges)
-
-    with open(file_path, "w") as f:
-        f.write(str(G.get_number_of_vertices()) + " ")
-        f.write(str(G.get_number_of_edges()) + "\n")
-
-        for edge in G.parse_edges():
-            f.write(f"{edge[0]} {edge[1]} {G.costs[(edge[0], edge[1])]}\n")
+    return G
 
 
 def read_graph(file_path):
@@ -139,36 +140,90 @@ def print_graph(G, option):
                 f.write(f"{edge[0]} {edge[1]} {G.costs[(edge[0], edge[1])]}\n")
 
 
+@instrumentation.timed("negative_cycle_detection")
 def negative_cycle_detection(G, source):
     """
-    Function that checks if a directed graph (DirectedGraph object) contains a negative cycle, using the Bellman-Ford
-    algorithm.
-    Time-Complexity: O(V^2*E), where V is the number of vertices and E the number of edges
+    Function that checks if a negative cycle can be reached from source in a directed graph (DirectedGraph object),
+    using the Bellman-Ford algorithm. The vertices are first mapped to the positions 0..V-1 and the edges to a list of
+    (origin, target, cost) triples, so the passes only do list lookups. The passes stop as soon as one of them changes
+    nothing (no negative cycle); if the V-th pass still changes a cost, going back V times through the predecessors of
+    the last changed vertex lands on a negative cycle, which is then followed once around. On large graphs the passes
+    are vectorized with NumPy when it is installed (see relaxation.py).
+    Time-Complexity: O(V*E) in the worst case, O(k*E) if the lowest costs walks have at most k - 1 edges
     :param G: DirectedGraph object
-    :param source: string (later converted to integer)
-    :return: boolean (True if a negative cycle was detected, False otherwise)
+    :param source: vertex (a string or an integer)
+    :return: None if no negative cycle is reachable from source, otherwise a tuple (cycle, cost) where cycle is the list
+             of the vertices of the cycle in order (the last one has an edge back to the first) and cost its total cost
     """
-    V = G.get_number_of_vertices()
-
-    dp = [math.inf for x in range(V)]
-    dp[int(source)] = 0
-
-    for i in range(1, V):
-        for vertex in G.parse_vertices():
-            for neighbour in G.parse_outbound(vertex):
-                cost = G.costs[(vertex, neighbour)]
-                if dp[int(vertex)] + cost < dp[int(neighbour)] and dp[int(vertex)] != math.inf:
-                    dp[int(neighbour)] = dp[int(vertex)] + cost
-
-    for vertex in G.parse_vertices():
-        for neighbour in G.parse_outbound(vertex):
-            cost = G.costs[(vertex, neighbour)]
-            if dp[int(vertex)] + cost < dp[int(neighbour)] and dp[int(vertex)] != math.inf:
-                return True
-
-    return False
-
+    vertices = G.parse_vertices()
+    V = len(vertices)
+    index = {str(vertex): position for position, vertex in enumerate(vertices)}
+    edges = [(index[str(x)], index[str(y)], G.costs[(x, y)]) for x, y in G.parse_edges()]
 
+    if relaxation.enabled(len(edges)):
+        rounds, last_changed, previous = _vectorized_bellman_ford(V, edges, index[str(source)])
+    else:
+        rounds, last_changed, previous = _bellman_ford(V, edges, index[str(source)])
+
+    instrumentation.count("negative_cycle_detection", iterations=rounds, relaxations=rounds * len(edges))
+    if last_changed == -1:
+        return None
+
+    vertex = last_changed
+    for i in range(V):
+        vertex = previous[vertex]
+    cycle = [vertex]
+    current = previous[vertex]
+    while current != vertex:
+        cycle.append(current)
+        current = previous[current]
+    cycle.reverse()
+
+    cost = sum(G.costs[(vertices[cycle[i - 1]], vertices[cycle[i]])] for i in range(len(cycle)))
+    return [vertices[position] for position in cycle], cost
+
+
+def _bellman_ford(V, edges, source):
+    # at most V passes over the edges, stopping after a pass that changes nothing; returns the number of passes, the
+    # last vertex changed by the last pass (-1 if it changed nothing) and the predecessors
+    dp = [math.inf] * V
+    previous = [-1] * V
+    dp[source] = 0
+
+    last_changed = -1
+    rounds = 0
+    while rounds < V:
+        rounds += 1
+        last_changed = -1
+        for x, y, cost in edges:
+            if dp[x] + cost < dp[y]:
+                dp[y] = dp[x] + cost
+                previous[y] = x
+                last_changed = y
+        if last_changed == -1:
+            break
+    return rounds, last_changed, previous
+
+
+def _vectorized_bellman_ford(V, edges, source):
+    # the same passes as _bellman_ford, each one relaxing all the edges at once
+    origins, targets, costs = zip(*edges)
+    arrays = relaxation.EdgeArrays(V, origins, targets, costs)
+    dp = arrays.distances(source)
+    previous = relaxation.numpy.full(V, -1, dtype=relaxation.numpy.intp)
+
+    rounds = 0
+    changed = ()
+    while rounds < V:
+        rounds += 1
+        changed = arrays.relax(dp, previous)
+        if not len(changed):
+            return rounds, -1, previous
+    # any vertex whose cost the last pass decreased leads back to the cycle
+    return rounds, int(changed[-1]), previous.tolist()
+
+
+@instrumentation.timed("lowest_cost_walk_dp")
 def lowest_cost_walk_dp(G, source, target):
     """
     Function that computes the lowest cost of a walk from source to target and builds the path of known length k, where
@@ -178,39 +233,168 @@ def lowest_cost_walk_dp(G, source, target):
         dp[s][0] = 0
         dp[i][j] = inf, for i=1,V, i!=s or i==s and j!=0, j=1,V-1
         dp[i][j] = dp[i-1][j-1] + min(costs[i-1][i]), i=1,V-1, and i is the outbound neighbor of i-1
-    Time-Complexity: O(V^2*E), where E is the number of edges
+    Only one row of the table (the costs of the walks of one length) is kept while the lengths are computed, plus a
+    checkpoint row every sqrt(V) lengths. The walk is then rebuilt backwards one block of sqrt(V) lengths at a time,
+    recomputing the rows of the block from its checkpoint together with their predecessors, so at most sqrt(V) rows of
+    predecessors exist at once. The lengths stop as soon as no walk of the current length exists. On large graphs the
+    rows are computed with NumPy when it is installed (see relaxation.py).
+    Time-Complexity: O(V*E), where E is the number of edges (every length is computed at most twice)
+    Memory: O(V*sqrt(V) + E), instead of the O(V^2) of the full table
     :param G: DirectedGraph object
     :param source: string (later converted to integer)
     :param target: string (later converted to integer)
     :return: the walk represented as a list and the minimum_cost as an integer
     """
     V = G.get_number_of_vertices()
-
-    dp = [[math.inf for x in range(V + 1)] for y in range(V)]
-    dp[int(source)][0] = 0
-
-    previous = [[math.inf for x in range(V)] for y in range(V)]
-
-    for length in range(1, V):
-        for vertex in G.parse_vertices():
-            if dp[int(vertex)][length - 1] != math.inf:
-                for neighbour in G.parse_outbound(vertex):
-                    if dp[int(neighbour)][length] > (dp[int(vertex)][length - 1] + G.costs[(vertex, neighbour)]):
-                        dp[int(neighbour)][length] = dp[int(vertex)][length - 1] + G.costs[(vertex, neighbour)]
-                        previous[int(neighbour)][length] = int(vertex)
-
+    adjacency = [(int(vertex), [(int(neighbour), G.costs[(vertex, neighbour)]) for neighbour in G.parse_outbound(vertex)])
+                 for vertex in G.parse_vertices()]
+    step = max(math.isqrt(V), 1)
+    counters = {"iterations": 0, "expansions": 0, "relaxations": 0}
+
+    if relaxation.enabled(G.get_number_of_edges()):
+        arrays = relaxation.EdgeArrays(V, *zip(*((vertex, neighbour, cost) for vertex, outbound in adjacency
+                                                 for neighbour, cost in outbound)))
+        row = arrays.distances(int(source))
+        next_walk_costs = lambda row, previous: _vectorized_next_walk_costs(arrays, row, previous, counters)
+        new_previous = lambda: relaxation.numpy.full(V, -1, dtype=relaxation.numpy.intp)
+    else:
+        row = [math.inf] * V
+        row[int(source)] = 0
+        next_walk_costs = lambda row, previous: _next_walk_costs(adjacency, row, previous, counters)
+        new_previous = lambda: array("l", [-1]) * V
+    checkpoints = [row]
     minimum_cost = math.inf
     minimum_length = 0
     for length in range(1, V):
-        if dp[int(target)][length] < minimum_cost:
-            minimum_cost = dp[int(target)][length]
-            minimum_length = int(length)
+        row = next_walk_costs(row, None)
+        if row is None:
+            break
+        if row[int(target)] < minimum_cost:
+            minimum_cost = row[int(target)]
+            minimum_length = length
+        if length % step == 0:
+            checkpoints.append(row)
 
     walk = [int(target)]
     current = int(target)
+    block_end = minimum_length
+    while block_end > 0:
+        block_start = (block_end - 1) // step * step
+        row = checkpoints[block_start // step]
+        previous = []
+        for length in range(block_start + 1, block_end + 1):
+            previous.append(new_previous())
+            row = next_walk_costs(row, previous[-1])
+        for length in range(block_end, block_start, -1):
+            current = int(previous[length - block_start - 1][current])
+            walk.append(current)
+        block_end = block_start
+    walk.reverse()
+
+    instrumentation.count("lowest_cost_walk_dp", **counters)
+    if minimum_cost != math.inf:
+        # the vectorized rows hold float64 costs
+        minimum_cost = int(minimum_cost)
+    return walk, minimum_cost
 
-    for length in range(minimum_length, 0, -1):
-        walk.insert(0, previous[int(current)][length])
-        current = previous[int(current)][length]
 
-    return walk, minimum_cost
+def _next_walk_costs(adjacency, row, previous, counters):
+    # the costs of the walks one edge longer than those of row, or None if there are none; when previous is given, the
+    # vertex before the last one of each walk is stored in it
+    next_row = [math.inf] * len(row)
+    changed = False
+    expansions = relaxations = 0
+    for vertex, outbound in adjacency:
+        cost = row[vertex]
+        if cost != math.inf:
+            expansions += 1
+            relaxations += len(outbound)
+            for neighbour, edge_cost in outbound:
+                if next_row[neighbour] > cost + edge_cost:
+                    next_row[neighbour] = cost + edge_cost
+                    changed = True
+                    if previous is not None:
+                        previous[neighbour] = vertex
+    counters["iterations"] += 1
+    counters["expansions"] += expansions
+    counters["relaxations"] += relaxations
+    return next_row if changed else None
+
+
+def _vectorized_next_walk_costs(arrays, row, previous, counters):
+    # the same as _next_walk_costs, with all the edges relaxed at once
+    counters["iterations"] += 1
+    counters["expansions"] += int(relaxation.numpy.count_nonzero(relaxation.numpy.isfinite(row)))
+    counters["relaxations"] += len(arrays)
+    return arrays.next_row(row, previous)
+
+
+def lowest_length_tree(G, source):
+    """
+    Function that runs a breadth-first search from source over the outbound edges and returns the parent of every
+    vertex reached (the source has the parent None). The lowest length path to any reached vertex can be rebuilt with
+    build_walk.
+    Runtime: O(V+E), where V is the number of vertices and E the number of edges
+    :param G: DirectedGraph object
+    :param source: vertex
+    :return: dictionary vertex -> parent, holding only the reached vertices
+    """
+    if source not in G.parse_vertices():
+        raise NonexistentVertexError
+    parent = {source: None}
+    queue = deque([source])
+    while queue:
+        vertex = queue.popleft()
+        for neighbour in G.parse_outbound(vertex):
+            if neighbour not in parent:
+                parent[neighbour] = vertex
+                queue.append(neighbour)
+    return parent
+
+
+def single_source_lowest_costs(G, source):
+    """
+    Function that computes the lowest cost of a walk from source to every vertex with the Bellman-Ford algorithm,
+    stopping as soon as a pass changes nothing. If a negative cycle is reachable from source, NegativeCycleError is
+    raised.
+    Runtime: O(V*E), where V is the number of vertices and E the number of edges
+    :param G: DirectedGraph object
+    :param source: vertex
+    :return: dictionary vertex -> lowest cost and dictionary vertex -> previous vertex on the walk, both holding only
+             the vertices reachable from source (the source has the previous vertex None)
+    """
+    if source not in G.parse_vertices():
+        raise NonexistentVertexError
+    cost = {source: 0}
+    previous = {source: None}
+    edges = [(x, y, G.costs[(x, y)]) for x, y in G.parse_edges()]
+
+    for i in range(G.get_number_of_vertices()):
+        changed = False
+        for x, y, c in edges:
+            if x in cost and cost[x] + c < cost.get(y, math.inf):
+                cost[y] = cost[x] + c
+                previous[y] = x
+                changed = True
+        if not changed:
+            return cost, previous
+    # the costs still changed in the V-th pass, so a negative cycle is reachable from source
+    raise NegativeCycleError
+
+
+def build_walk(previous, target):
+    """
+    Function that rebuilds the walk ending in target from a dictionary vertex -> previous vertex, as returned by
+    lowest_length_tree or single_source_lowest_costs.
+    Runtime: O(length of the walk)
+    :param previous: dictionary vertex -> previous vertex (None for the source)
+    :param target: vertex
+    :return: the walk as a list of vertices, or None if target was not reached
+    """
+    if target not in previous:
+        return None
+    walk = [target]
+    while previous[walk[-1]] is not None:
+        walk.append(previous[walk[-1]])
+    walk.reverse()
+    return walk
@@ -0,0 +1,97 @@
+"""
+Vectorized edge relaxation for the Bellman-Ford style algorithms.
+
+The graph is exported once to three NumPy arrays (the origin, the target and the cost of every edge, with the vertices
+replaced by their positions 0..V-1), and then every round relaxes all the edges at once: the candidate costs are
+computed for every edge and the minimum per target is taken with numpy.minimum.at. The costs are kept as float64, so
+math.inf marks the unreachable vertices; integer costs stay exact as long as the walk costs stay below 2^53.
+
+NumPy is optional. When it is not installed (or the graph has fewer than MINIMUM_EDGES edges, where the fixed cost of
+a NumPy call outweighs the gain), enabled() returns False and the algorithms keep using their Python loops.
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# below this number of edges the Python loops are faster than a round of NumPy calls
+MINIMUM_EDGES = 1024
+
+
+def enabled(edge_count):
+    """
+    :param edge_count: the number of edges of the graph
+    :return: True if the vectorized rounds should be used for a graph with edge_count edges
+    """
+    return numpy is not None and edge_count >= MINIMUM_EDGES
+
+
+class EdgeArrays:
+    def __init__(self, vertex_count, origins, targets, costs):
+        """
+        Exports a graph to edge arrays. The order of the edges decides which origin is kept as predecessor when several
+        edges give the same minimum cost: the first one wins.
+        :param vertex_count: the number of vertices
+        :param origins: the origin position of every edge
+        :param targets: the target position of every edge
+        :param costs: the cost of every edge
+        """
+        self.vertex_count = vertex_count
+        self.origins = numpy.asarray(origins, dtype=numpy.intp)
+        self.targets = numpy.asarray(targets, dtype=numpy.intp)
+        self.costs = numpy.asarray(costs, dtype=numpy.float64)
+        self.__positions = numpy.arange(len(self.origins), dtype=numpy.intp)
+
+    def __len__(self):
+        return len(self.origins)
+
+    def distances(self, source):
+        """
+        :param source: the position of the source vertex
+        :return: a new cost array, 0 for the source and inf everywhere else
+        """
+        distance = numpy.full(self.vertex_count, numpy.inf)
+        distance[source] = 0
+        return distance
+
+    def next_row(self, row, previous=None):
+        """
+        Computes the lowest costs of the walks one edge longer than those of row.
+        :param row: cost array of the walks of some length
+        :param previous: if given, an integer array where the origin of the last edge of every walk is stored
+        :return: the new cost array, or None if no walk is one edge longer
+        """
+        candidates = row[self.origins] + self.costs
+        next_row = numpy.full(self.vertex_count, numpy.inf)
+        numpy.minimum.at(next_row, self.targets, candidates)
+        reached = numpy.isfinite(next_row)
+        if not reached.any():
+            return None
+        if previous is not None:
+            self.__store_origins(candidates, next_row, reached, previous)
+        return next_row
+
+    def relax(self, distance, previous):
+        """
+        Relaxes every edge once, using the costs distance had before the round, and updates distance and previous in
+        place.
+        :param distance: cost array
+        :param previous: integer array of predecessors
+        :return: the array of the positions of the vertices whose cost decreased (empty if there are none)
+        """
+        candidates = distance[self.origins] + self.costs
+        best = numpy.full(self.vertex_count, numpy.inf)
+        numpy.minimum.at(best, self.targets, candidates)
+        improved = best < distance
+        changed = numpy.flatnonzero(improved)
+        if len(changed):
+            distance[improved] = best[improved]
+            self.__store_origins(candidates, best, improved, previous)
+        return changed
+
+    def __store_origins(self, candidates, best, selected, previous):
+        # the first edge reaching the minimum of its target gives the predecessor of every selected target
+        reaching = selected[self.targets] & (candidates == best[self.targets])
+        first = numpy.full(self.vertex_count, len(self.origins), dtype=numpy.intp)
+        numpy.minimum.at(first, self.targets[reaching], self.__positions[reaching])
+        previous[selected] = self.origins[first[selected]]
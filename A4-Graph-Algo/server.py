@@ -0,0 +1,193 @@
+"""
+Long-running query server: the graph is loaded once and then queried through JSON lines, either on standard input and
+output or on a Unix socket (any number of clients at once).
+
+Requests, one JSON object per line (vertices may be given as numbers or strings):
+    {"id": 1, "op": "path", "source": 0, "target": 5}       lowest length path (breadth-first search)
+    {"id": 2, "op": "walk", "source": 0, "target": 5}       lowest cost walk (Bellman-Ford, run in the worker pool)
+    {"id": 3, "op": "degree", "vertex": 0}                   in and out degree
+    {"id": 4, "op": "topological_sort"}
+    {"id": 5, "op": "critical_path"}                         times and critical activities (activity files only)
+
+Every request is answered with {"id": ..., "result": ...} or {"id": ..., "error": "..."} as soon as it is ready, so
+answers may come out of order. Walk requests that arrive while the walks from the same source are being computed wait
+for that computation instead of starting a new one.
+
+Usage:
+    python server.py graph1k.txt [--socket PATH] [--workers N]
+    python server.py input.txt --activities
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from exceptions import NegativeCycleError, NonexistentVertexError
+from external_functions import read_graph, read_activities, lowest_length_tree, single_source_lowest_costs, build_walk
+
+# the graph of a worker process, set once by _initialize_worker
+_graph = None
+
+
+def _initialize_worker(G):
+    global _graph
+    _graph = G
+
+
+def _lowest_costs(source):
+    return single_source_lowest_costs(_graph, source)
+
+
+class GraphServer:
+    def __init__(self, G, workers=None):
+        self.__g = G
+        self.__vertices = {str(vertex): vertex for vertex in G.parse_vertices()}
+        # every worker receives the graph once, when it starts; the workers are spawned rather than forked, so that they
+        # do not inherit (and keep open) the client connections
+        self.__pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                          initializer=_initialize_worker, initargs=(G,))
+        self.__pending = {}  # source -> future of the walks from source that are being computed
+        self.__topological_order = None
+
+    def close(self):
+        self.__pool.shutdown()
+
+    def __vertex(self, value):
+        if str(value) not in self.__vertices:
+            raise NonexistentVertexError
+        return self.__vertices[str(value)]
+
+    async def __lowest_costs(self, source):
+        if source not in self.__pending:
+            future = asyncio.get_running_loop().run_in_executor(self.__pool, _lowest_costs, source)
+            self.__pending[source] = future
+            future.add_done_callback(lambda done: self.__pending.pop(source, None))
+        return await self.__pending[source]
+
+    async def answer(self, request):
+        """
+        Answers one request.
+        :param request: dictionary (the decoded JSON request)
+        :return: the result, as a JSON-serializable object
+        """
+        operation = request.get("op")
+        if operation == "path":
+            source, target = self.__vertex(request["source"]), self.__vertex(request["target"])
+            path = build_walk(lowest_length_tree(self.__g, source), target)
+            return {"path": path, "length": len(path) - 1 if path is not None else None}
+        if operation == "walk":
+            source, target = self.__vertex(request["source"]), self.__vertex(request["target"])
+            cost, previous = await self.__lowest_costs(source)
+            return {"walk": build_walk(previous, target), "cost": cost.get(target)}
+        if operation == "degree":
+            vertex = self.__vertex(request["vertex"])
+            return {"in": self.__g.in_degree(vertex), "out": self.__g.out_degree(vertex)}
+        if operation == "topological_sort":
+            if self.__topological_order is None:
+                self.__topological_order = self.__g.topological_sorting()
+            return {"dag": bool(self.__topological_order), "order": self.__topological_order}
+        if operation == "critical_path":
+            earliest_start, earliest_end, latest_start, latest_end, duration = self.__g.get_times()
+            if duration == -1:
+                return {"dag": False}
+            return {"dag": True, "duration": duration, "earliest_start": earliest_start, "latest_start": latest_start,
+                    "critical": self.__g.critical_activities()}
+        raise ValueError("unknown operation: {}".format(operation))
+
+    async def respond(self, line):
+        """
+        Answers one request line.
+        :param line: string (one JSON object)
+        :return: string (one JSON object, without the line end)
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return json.dumps({"id": None, "error": "invalid JSON"})
+        identifier = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+            return json.dumps({"id": identifier, "result": await self.answer(request)})
+        except NonexistentVertexError:
+            error = "the vertex does not exist"
+        except NegativeCycleError:
+            error = "a negative cycle is reachable from the source"
+        except KeyError as missing:
+            error = "missing field: {}".format(missing.args[0])
+        except Exception as exception:
+            error = "{}: {}".format(type(exception).__name__, exception)
+        return json.dumps({"id": identifier, "error": error})
+
+    async def serve(self, read_line, write_line):
+        """
+        Reads request lines until the end of the input, answering each of them in its own task.
+        :param read_line: coroutine function returning the next line ("" at the end of the input)
+        :param write_line: function writing one answer line
+        """
+        tasks = set()
+
+        async def handle(line):
+            write_line(await self.respond(line))
+
+        while True:
+            line = await read_line()
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.ensure_future(handle(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
+async def serve_stdio(server):
+    loop = asyncio.get_running_loop()
+
+    def write_line(text):
+        sys.stdout.write(text + "\n")
+        sys.stdout.flush()
+
+    await server.serve(lambda: loop.run_in_executor(None, sys.stdin.readline), write_line)
+
+
+async def serve_socket(server, path):
+    async def client(reader, writer):
+        async def read_line():
+            return (await reader.readline()).decode()
+
+        await server.serve(read_line, lambda text: writer.write((text + "\n").encode()))
+        await writer.drain()
+        writer.close()
+
+    unix_server = await asyncio.start_unix_server(client, path)
+    async with unix_server:
+        await unix_server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer graph queries sent as JSON lines.")
+    parser.add_argument("file", help="the graph file (or the activities file, with --activities)")
+    parser.add_argument("--activities", action="store_true", help="read the file with read_activities")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of standard input and output")
+    parser.add_argument("--workers", type=int, help="the number of worker processes for the walk queries")
+    arguments = parser.parse_args()
+
+    G = read_activities(arguments.file) if arguments.activities else read_graph(arguments.file)
+    server = GraphServer(G, arguments.workers)
+    try:
+        if arguments.socket:
+            asyncio.run(serve_socket(server, arguments.socket))
+        else:
+            asyncio.run(serve_stdio(server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
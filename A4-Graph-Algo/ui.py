@@ -308,9 +308,11 @@ class UI:
             print("The target vertex does not exist.")
 
         walk, minimum_cost = lowest_cost_walk_dp(self.__g, int(source), int(target))
+        negative_cycle = negative_cycle_detection(self.__g, source)
 
-        if negative_cycle_detection(self.__g, source):
-            print("Negative cycle detected.")
+        if negative_cycle is not None:
+            cycle, cycle_cost = negative_cycle
+            print(f"Negative cycle detected: {'-'.join(str(vertex) for vertex in cycle)}-{cycle[0]} of cost {cycle_cost}.")
         elif minimum_cost == math.inf:
             print(f"Vertex {target} is not accesible from vertex {source}.")
         else:
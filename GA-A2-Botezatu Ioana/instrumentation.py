@@ -0,0 +1,99 @@
+"""
+Opt-in counters and timers for the graph algorithms.
+
+Instrumentation is disabled by default. While it is disabled, a function decorated with timed() is called directly and
+count() returns at once, so the only cost is one flag check per call; the algorithms keep their counters in local
+variables and hand them to count() once, when they finish.
+
+Counters:
+    expansions      vertices taken out of a queue, heap or frontier and expanded
+    relaxations     edges examined while expanding vertices
+    pushes          vertices put into a queue, heap or frontier
+    iterations      rounds of the outer loop (Bellman-Ford passes, walk lengths)
+
+Usage:
+    import instrumentation
+    instrumentation.enable()
+    ...
+    print(instrumentation.report_json())
+"""
+import json
+import time
+from functools import wraps
+
+_enabled = False
+# name -> {"calls": ..., "seconds": ..., counter: ...}
+_statistics = {}
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    _statistics.clear()
+
+
+def _entry(name):
+    if name not in _statistics:
+        _statistics[name] = {"calls": 0, "seconds": 0.0}
+    return _statistics[name]
+
+
+def count(name, **counters):
+    """
+    Adds the given counters to the statistics of name, if instrumentation is enabled.
+    :param name: the name of the instrumented function
+    :param counters: counter name -> value to add
+    """
+    if not _enabled:
+        return
+    entry = _entry(name)
+    for counter, value in counters.items():
+        entry[counter] = entry.get(counter, 0) + value
+
+
+def timed(name):
+    """
+    Decorator that records the number of calls and the wall time spent in a function under the given name, while
+    instrumentation is enabled.
+    :param name: the name the statistics are recorded under
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                entry = _entry(name)
+                entry["calls"] += 1
+                entry["seconds"] += time.perf_counter() - start
+        return wrapper
+    return decorator
+
+
+def report():
+    """
+    :return: a copy of the statistics, as a dictionary name -> dictionary of counters
+    """
+    return {name: dict(entry) for name, entry in _statistics.items()}
+
+
+def report_json(indent=2):
+    """
+    :return: the statistics as a JSON string
+    """
+    return json.dumps(report(), indent=indent, sort_keys=True)
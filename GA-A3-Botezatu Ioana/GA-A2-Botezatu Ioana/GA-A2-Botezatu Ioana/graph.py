@@ -1,5 +1,15 @@
-import copy
-from collections import deque
+import time
+from collections import deque, OrderedDict
+from heapq import heappush, heappop
+
+import instrumentation
+import relaxation
+
+# number of sources whose breadth-first search trees are kept by bfs_tree
+BFS_TREE_CACHE_SIZE = 16
+# number of path and walk results kept by the result cache
+RESULT_CACHE_SIZE = 128
+
 
 class TripleDictGraph:
     def __init__(self, number_of_vertices, number_of_edges):
@@ -8,6 +18,18 @@ class TripleDictGraph:
         self._dictionary_in = {}
         self._dictionary_out = {}
         self._dictionary_cost = {}
+        self._bfs_trees = OrderedDict()
+        # the version is bumped by every change of the graph, so cached results of older versions are never returned
+        self._version = 0
+        self._results = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # make_copy shares the adjacency lists and the cost dictionary between the copies; once lists are shared, only
+        # the lists of the vertices in _owned_in/_owned_out may be modified in place, the others are copied first
+        self._shares_lists = False
+        self._owned_in = set()
+        self._owned_out = set()
+        self._owns_cost = True
         for index in range(number_of_vertices):
             self._dictionary_in[index] = []
             self._dictionary_out[index] = []
@@ -32,17 +54,76 @@ class TripleDictGraph:
     def number_of_edges(self):
         return self._number_of_edges
 
+    @property
+    def version(self):
+        return self._version
+
     def set_number_of_vertices(self, vertices):
         self._number_of_vertices = vertices
 
     def set_dictionary_cost(self, dictionary_cost):
         self._dictionary_cost = dictionary_cost
+        self._owns_cost = True
+        self._mark_modified()
 
     def set_dictionary_in(self, dictionary_in):
         self._dictionary_in = dictionary_in
+        self._owned_in = set()
+        self._mark_modified()
 
     def set_dictionary_out(self, dictionary_out):
         self._dictionary_out = dictionary_out
+        self._owned_out = set()
+        self._mark_modified()
+
+    def _mark_modified(self):
+        # called by every method that changes the vertices, the edges or the costs, drops the results computed for the
+        # old graph; the version in the result keys only guards a result computed while the graph was being changed
+        self._version += 1
+        self._bfs_trees.clear()
+        self._results.clear()
+
+    def _writable_in(self, x):
+        # the inbound list of x, copied first if it may be shared with another graph
+        if self._shares_lists and x not in self._owned_in:
+            self._dictionary_in[x] = list(self._dictionary_in[x])
+            self._owned_in.add(x)
+        return self._dictionary_in[x]
+
+    def _writable_out(self, x):
+        # the outbound list of x, copied first if it may be shared with another graph
+        if self._shares_lists and x not in self._owned_out:
+            self._dictionary_out[x] = list(self._dictionary_out[x])
+            self._owned_out.add(x)
+        return self._dictionary_out[x]
+
+    def _writable_cost(self):
+        # the cost dictionary, copied first if it is shared with another graph
+        if not self._owns_cost:
+            self._dictionary_cost = dict(self._dictionary_cost)
+            self._owns_cost = True
+        return self._dictionary_cost
+
+    def cache_statistics(self):
+        """
+        Returns the statistics of the path and walk result cache.
+        :return: a dictionary with the number of hits and misses, the number of cached results and the current version
+        """
+        return {"hits": self._cache_hits, "misses": self._cache_misses, "size": len(self._results),
+                "version": self._version}
+
+    def _cached_result(self, key):
+        if key in self._results:
+            self._cache_hits += 1
+            self._results.move_to_end(key)
+            return self._results[key]
+        self._cache_misses += 1
+        return None
+
+    def _cache_result(self, key, result):
+        self._results[key] = result
+        if len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
 
     def parse_vertices(self):
         vertices = list(self._dictionary_in.keys())
@@ -67,34 +148,53 @@ class TripleDictGraph:
             return False
         self._dictionary_in[x] = []
         self._dictionary_out[x] = []
+        if self._shares_lists:
+            self._owned_in.add(x)
+            self._owned_out.add(x)
         self._number_of_vertices += 1
+        self._mark_modified()
         return True
 
     def remove_vertex(self, x):
         if x not in self._dictionary_in.keys() and x not in self._dictionary_out.keys():
             return False
-
-        keys = self._dictionary_out[x]
-        for key in keys:
-            if x in self._dictionary_in[key]:
-                self._dictionary_in[key].remove(x)
-
-        keys = self._dictionary_in[x]
-        for key in keys:
-            if x in self._dictionary_out[key]:
-                self._dictionary_out[key].remove(x)
-
-        self._dictionary_in.pop(x)
-        self._dictionary_out.pop(x)
-
-        keys = list(self._dictionary_cost.keys())
-        for key in keys:
-            if key[0] == x or key[1] == x:
-                self._dictionary_cost.pop(key)
-                self._number_of_edges -= 1
+        self._remove_incident_edges(x)
         self._number_of_vertices -= 1
+        self._mark_modified()
         return True
 
+    def remove_vertices(self, vertices):
+        """
+        Removes several vertices together with their edges; the vertices that are not in the graph are ignored.
+        :param vertices: an iterable of vertices
+        :return: the number of removed vertices
+        """
+        removed = 0
+        for x in vertices:
+            if x in self._dictionary_in.keys():
+                self._remove_incident_edges(x)
+                removed += 1
+        if removed:
+            self._number_of_vertices -= removed
+            self._mark_modified()
+        return removed
+
+    def _remove_incident_edges(self, x):
+        # the inbound and outbound lists of x index its edges, so only the edges of x and its neighbours are visited
+        dictionary_cost = self._writable_cost()
+        for y in self._dictionary_out.pop(x):
+            if y != x:
+                self._writable_in(y).remove(x)
+            dictionary_cost.pop((x, y))
+            self._number_of_edges -= 1
+        for y in self._dictionary_in.pop(x):
+            if y != x:
+                self._writable_out(y).remove(x)
+                dictionary_cost.pop((y, x))
+                self._number_of_edges -= 1
+        self._owned_in.discard(x)
+        self._owned_out.discard(x)
+
     def in_degree(self, x):
         if x not in self._dictionary_in.keys():
             return -1
@@ -112,10 +212,11 @@ class TripleDictGraph:
             return False
         elif (x, y) in self._dictionary_cost.keys():
             return False
-        self._dictionary_in[y].append(x)
-        self._dictionary_out[x].append(y)
-        self._dictionary_cost[(x, y)] = cost
+        self._writable_in(y).append(x)
+        self._writable_out(x).append(y)
+        self._writable_cost()[(x, y)] = cost
         self._number_of_edges += 1
+        self._mark_modified()
         return True
 
     def remove_edge(self, x, y):
@@ -127,10 +228,11 @@ class TripleDictGraph:
             return False
         elif (x, y) not in self._dictionary_cost.keys():
             return False
-        self._dictionary_in[y].remove(x)
-        self._dictionary_out[x].remove(y)
-        self._dictionary_cost.pop((x, y))
+        self._writable_in(y).remove(x)
+        self._writable_out(x).remove(y)
+        self._writable_cost().pop((x, y))
         self._number_of_edges -= 1
+        self._mark_modified()
         return True
 
     def find_if_edge(self, x, y):
@@ -143,92 +245,310 @@ class TripleDictGraph:
     def change_cost(self, x, y, cost):
         if (x, y) not in self._dictionary_cost.keys():
             return False
-        self._dictionary_cost[(x, y)] = cost
+        self._writable_cost()[(x, y)] = cost
+        self._mark_modified()
         return True
 
     def make_copy(self):
-        return copy.deepcopy(self)
-
-    def find_lowest_length_path(self, start_vertex, end_vertex):
+        """
+        Returns a copy of the graph that shares its adjacency lists and its cost dictionary with this graph. A list (or
+        the cost dictionary) is duplicated by whichever graph modifies it first, so a copy costs O(V) instead of a deep
+        copy of every list, and unchanged parts stay shared. The copy starts with empty caches.
+        :return: the new TripleDictGraph
+        """
+        graph = TripleDictGraph(0, 0)
+        graph._number_of_vertices = self._number_of_vertices
+        graph._number_of_edges = self._number_of_edges
+        graph._dictionary_in = dict(self._dictionary_in)
+        graph._dictionary_out = dict(self._dictionary_out)
+        graph._dictionary_cost = self._dictionary_cost
+        graph._version = self._version
+        # from now on neither graph owns any of the lists or the cost dictionary
+        for owner in (self, graph):
+            owner._shares_lists = True
+            owner._owned_in = set()
+            owner._owned_out = set()
+            owner._owns_cost = False
+        return graph
+
+    @instrumentation.timed("find_lowest_length_path")
+    def find_lowest_length_path(self, start_vertex, end_vertex, bidirectional=False):
         """
         Finds the lowest length path between start_vertex and end_vertex using backward breadth-first search from the
-        end_vertex.
+        end_vertex. Every vertex is enqueued at most once and only remembers the vertex that follows it on the path, so
+        the path is rebuilt once at the end. With bidirectional=True the search also advances forward from the
+        start_vertex, always expanding the smaller frontier, and stops when the two searches meet. Results are cached
+        until the graph is modified.
 
         :param start_vertex: The starting vertex.
         :param end_vertex: The ending vertex.
-        :return: The lowest length path as a list of vertices, or None if there is no path.
+        :param bidirectional: Whether to search from both ends at once.
+        :return: The lowest length path as a list of vertices and its length, (-1, -1) if a vertex does not exist or
+        (0, 0) if there is no path.
         """
+        key = (self._version, "bidirectional_bfs" if bidirectional else "bfs", start_vertex, end_vertex)
+        result = self._cached_result(key)
+        if result is None:
+            result = self._lowest_length_path(start_vertex, end_vertex, bidirectional)
+            self._cache_result(key, result)
+        path, length = result
+        if isinstance(path, list):
+            # the caller gets its own copy of the cached path
+            return list(path), length
+        return result
+
+    def _lowest_length_path(self, start_vertex, end_vertex, bidirectional):
         # check if start_vertex and end_vertex are valid vertices
         if start_vertex not in self._dictionary_in.keys() or end_vertex not in self._dictionary_in.keys():
             return (-1, -1)
 
-        # perform backward BFS from the end_vertex
-        queue = deque([(end_vertex, [end_vertex], 0)])
-        visited = set()
+        if start_vertex in self._bfs_trees:
+            path = self._path_from_tree(start_vertex, end_vertex)
+        elif bidirectional:
+            path = self._bidirectional_search(start_vertex, end_vertex)
+        else:
+            path = self._backward_search(start_vertex, end_vertex)
 
-        while queue:
-            vertex, path, length = queue.popleft()
-
-            if vertex in visited:
-                continue
-
-            visited.add(vertex)
+        if path is None:
+            # there is no path from start_vertex to end_vertex
+            return (0, 0)
+        return path, len(path) - 1
 
+    @instrumentation.timed("bfs_tree")
+    def bfs_tree(self, source):
+        """
+        Runs a breadth-first search from source over the outbound edges and returns, for every vertex of the graph, its
+        distance from source and its parent in the search tree. The trees of the last BFS_TREE_CACHE_SIZE sources are
+        cached until the graph is modified through its methods, and find_lowest_length_path answers queries from a
+        cached source in O(path length). The returned dictionaries are shared with the cache and must not be modified.
+
+        :param source: The vertex the search starts from.
+        :return: (distance, parent), two dictionaries keyed by vertex; unreachable vertices have distance -1, and
+        unreachable vertices and the source have parent -1.
+        """
+        if source not in self._dictionary_out.keys():
+            raise ValueError("The source vertex does not exist!")
+        if source in self._bfs_trees:
+            self._bfs_trees.move_to_end(source)
+            return self._bfs_trees[source]
+
+        distance = dict.fromkeys(self._dictionary_in.keys(), -1)
+        parent = dict.fromkeys(self._dictionary_in.keys(), -1)
+        distance[source] = 0
+        queue = deque([source])
+        expansions = relaxations = 0
+        while queue:
+            vertex = queue.popleft()
+            expansions += 1
+            relaxations += len(self._dictionary_out[vertex])
+            for child in self._dictionary_out[vertex]:
+                if distance[child] == -1:
+                    distance[child] = distance[vertex] + 1
+                    parent[child] = vertex
+                    queue.append(child)
+        # every reached vertex was pushed and expanded exactly once
+        instrumentation.count("bfs_tree", expansions=expansions, relaxations=relaxations, pushes=expansions)
+
+        self._bfs_trees[source] = (distance, parent)
+        if len(self._bfs_trees) > BFS_TREE_CACHE_SIZE:
+            self._bfs_trees.popitem(last=False)
+        return distance, parent
+
+    def _path_from_tree(self, start_vertex, end_vertex):
+        distance, parent = self.bfs_tree(start_vertex)
+        if distance[end_vertex] == -1:
+            return None
+        path = [end_vertex]
+        while path[-1] != start_vertex:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+    def _backward_search(self, start_vertex, end_vertex):
+        # following[v] is the vertex after v on a lowest length path from v to end_vertex
+        following = {end_vertex: None}
+        queue = deque([end_vertex])
+
+        expansions = relaxations = 0
+        while queue and start_vertex not in following:
+            vertex = queue.popleft()
+            expansions += 1
+            relaxations += len(self._dictionary_in[vertex])
             for parent in self._dictionary_in[vertex]:
-
-                if vertex == start_vertex:
-                    # found a path from start_vertex to end_vertex
-                    return list(reversed(path)), length
-
-                queue.append((parent, path + [parent], length + 1))
-
-        # there is no path from start_vertex to end_vertex
-        return (0, 0)
-
+                if parent not in following:
+                    following[parent] = vertex
+                    queue.append(parent)
+        instrumentation.count("find_lowest_length_path", expansions=expansions, relaxations=relaxations,
+                              pushes=len(following))
+
+        if start_vertex not in following:
+            return None
+        path = [start_vertex]
+        while following[path[-1]] is not None:
+            path.append(following[path[-1]])
+        return path
+
+    def _bidirectional_search(self, start_vertex, end_vertex):
+        # previous[v] is the vertex before v on a lowest length path from start_vertex, following[v] the one after v
+        # on a lowest length path to end_vertex; depth_* hold the corresponding distances
+        previous = {start_vertex: None}
+        following = {end_vertex: None}
+        depth_forward = {start_vertex: 0}
+        depth_backward = {end_vertex: 0}
+        forward_frontier = [start_vertex]
+        backward_frontier = [end_vertex]
+        meeting = start_vertex if start_vertex == end_vertex else None
+        expansions = relaxations = 0
+
+        while meeting is None and forward_frontier and backward_frontier:
+            # expand a whole level of the smaller frontier; among the vertices of that level reached by the other
+            # search, the one closest to its own end gives a lowest length path
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, neighbours, parents, depth, other_depth = \
+                    forward_frontier, self._dictionary_out, previous, depth_forward, depth_backward
+            else:
+                frontier, neighbours, parents, depth, other_depth = \
+                    backward_frontier, self._dictionary_in, following, depth_backward, depth_forward
+            next_frontier = []
+            expansions += len(frontier)
+            for vertex in frontier:
+                relaxations += len(neighbours[vertex])
+                for neighbour in neighbours[vertex]:
+                    if neighbour not in parents:
+                        parents[neighbour] = vertex
+                        depth[neighbour] = depth[vertex] + 1
+                        next_frontier.append(neighbour)
+                        if neighbour in other_depth and (meeting is None or other_depth[neighbour] < other_depth[meeting]):
+                            meeting = neighbour
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        instrumentation.count("find_lowest_length_path", expansions=expansions, relaxations=relaxations,
+                              pushes=len(previous) + len(following))
+
+        if meeting is None:
+            return None
+        path = [meeting]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        path.reverse()
+        while following[path[-1]] is not None:
+            path.append(following[path[-1]])
+        return path
+
+    @instrumentation.timed("find_minimum_cost_walk")
     def find_minimum_cost_walk(self, first_vertex, second_vertex):
+        """
+        Finds a minimum cost walk between two vertices. When no edge has a negative cost, Dijkstra's algorithm with a
+        binary heap is used and stops as soon as second_vertex is settled; otherwise a queue-based Bellman-Ford (SPFA)
+        relaxes only the outbound edges of the vertices whose distance improved, or, on large graphs when NumPy is
+        installed, a Bellman-Ford that relaxes all the edges of a round at once (see relaxation.py). Results are cached
+        until the graph is modified.
+        :param first_vertex: the start vertex
+        :param second_vertex: the end vertex
+        :return: the predecessor dictionary (-1 for vertices without one) and the cost of the walk (inf if there is none)
+        :raises ValueError: if a negative cost cycle is reachable from first_vertex
+        """
+        key = (self._version, "minimum_cost_walk", first_vertex, second_vertex)
+        result = self._cached_result(key)
+        if result is None:
+            result = self._minimum_cost_walk(first_vertex, second_vertex)
+            self._cache_result(key, result)
+        predecessor, cost = result
+        # the caller gets its own copy of the cached predecessor dictionary
+        return dict(predecessor), cost
+
+    def _minimum_cost_walk(self, first_vertex, second_vertex):
         inf = float('inf')
-        distance = {}
-        #in order to find the minimum cost,we start by instantiating everything with infinity
-        for vertex in self._dictionary_in.keys():
-            distance[vertex] = inf
-
-        # the vector distance will help us with saving the actual minimum costs
+        distance = dict.fromkeys(self._dictionary_in.keys(), inf)
         distance[first_vertex] = 0
-
         #the dictionary predecessor will save the path of our walk if it exists
-        predecessor = {}
-
-        for vertex in self._dictionary_in.keys():
-            predecessor[vertex] = -1
-
-        changed = True
-        index = 0
-        while changed and index < len(self._dictionary_in.keys()):
-            changed = False
-            for x in self._dictionary_in.keys():
-                for y in self._dictionary_out[x]:
-                    #verify for every edge and update if the found cost is less than the one from the vecto "distance"
-                    edge_weight = (x, y)
-                    if (
-                            distance[y] > distance[x] + self._dictionary_cost[edge_weight]
-                            and distance[x] != float('inf')
-                    ):
-                        distance[y] = distance[x] + self._dictionary_cost[edge_weight]
-                        predecessor[y] = x
-                        changed = True
-            index += 1
-
-        for x in self._dictionary_in.keys():
-            for y in self._dictionary_out[x]:
-                edge_weight = (x, y)
-                if (
-                        distance[y] > distance[x] + self._dictionary_cost[edge_weight]
-                        and distance[x] != float('inf')
-                ):
-                    raise ValueError("Negative weight cycle exists in the graph")
+        predecessor = dict.fromkeys(self._dictionary_in.keys(), -1)
+
+        if any(cost < 0 for cost in self._dictionary_cost.values()):
+            if relaxation.enabled(len(self._dictionary_cost)) and first_vertex in self._dictionary_in:
+                self._vectorized_bellman_ford(first_vertex, distance, predecessor)
+            else:
+                self._queue_bellman_ford(first_vertex, distance, predecessor)
+        else:
+            self._dijkstra(first_vertex, second_vertex, distance, predecessor)
         #return the path and the cost
         return predecessor, distance[second_vertex]
 
+    def _dijkstra(self, first_vertex, second_vertex, distance, predecessor):
+        heap = [(0, first_vertex)]
+        expansions = relaxations = pushes = 0
+        while heap:
+            cost, x = heappop(heap)
+            if cost > distance[x]:
+                #stale entry, x was already settled with a smaller cost
+                continue
+            if x == second_vertex:
+                break
+            expansions += 1
+            neighbours = self._dictionary_out.get(x, ())
+            relaxations += len(neighbours)
+            for y in neighbours:
+                new_cost = cost + self._dictionary_cost[(x, y)]
+                if new_cost < distance[y]:
+                    distance[y] = new_cost
+                    predecessor[y] = x
+                    heappush(heap, (new_cost, y))
+                    pushes += 1
+        instrumentation.count("find_minimum_cost_walk", expansions=expansions, relaxations=relaxations, pushes=pushes)
+
+    def _queue_bellman_ford(self, first_vertex, distance, predecessor):
+        vertices = len(self._dictionary_in)
+        queue = deque([first_vertex])
+        in_queue = {first_vertex}
+        #without a negative cycle every vertex is queued at most once per round and there are at most V - 1 rounds
+        queued = dict.fromkeys(self._dictionary_in.keys(), 0)
+        expansions = relaxations = pushes = 0
+        while queue:
+            x = queue.popleft()
+            in_queue.discard(x)
+            cost = distance[x]
+            expansions += 1
+            neighbours = self._dictionary_out.get(x, ())
+            relaxations += len(neighbours)
+            for y in neighbours:
+                new_cost = cost + self._dictionary_cost[(x, y)]
+                if new_cost < distance[y]:
+                    distance[y] = new_cost
+                    predecessor[y] = x
+                    if y not in in_queue:
+                        queued[y] += 1
+                        if queued[y] >= vertices:
+                            instrumentation.count("find_minimum_cost_walk", expansions=expansions,
+                                                  relaxations=relaxations, pushes=pushes)
+                            raise ValueError("Negative weight cycle exists in the graph")
+                        in_queue.add(y)
+                        queue.append(y)
+                        pushes += 1
+        instrumentation.count("find_minimum_cost_walk", expansions=expansions, relaxations=relaxations, pushes=pushes)
+
+    def _vectorized_bellman_ford(self, first_vertex, distance, predecessor):
+        #Bellman-Ford over NumPy edge arrays: every round relaxes all the edges at once, stopping after a round that
+        #changes nothing; a change in round V means a negative cycle is reachable
+        vertices = list(self._dictionary_in.keys())
+        index = {vertex: position for position, vertex in enumerate(vertices)}
+        origins, targets = zip(*((index[x], index[y]) for x, y in self._dictionary_cost.keys()))
+        arrays = relaxation.EdgeArrays(len(vertices), origins, targets, list(self._dictionary_cost.values()))
+        costs = arrays.distances(index[first_vertex])
+        previous = relaxation.numpy.full(len(vertices), -1, dtype=relaxation.numpy.intp)
+        rounds = 0
+        changed = True
+        while changed and rounds < len(vertices):
+            rounds += 1
+            changed = len(arrays.relax(costs, previous)) > 0
+        instrumentation.count("find_minimum_cost_walk", iterations=rounds, relaxations=rounds * len(arrays))
+        if changed:
+            raise ValueError("Negative weight cycle exists in the graph")
+        for position in relaxation.numpy.flatnonzero(previous >= 0).tolist():
+            distance[vertices[position]] = int(costs[position])
+            predecessor[vertices[position]] = vertices[previous[position]]
+
 def write_graph_to_file(graph, file):
     file = open(file, "w")
     if graph.number_of_vertices and graph.number_of_edges:
@@ -263,54 +583,88 @@ def write_modified_graph_to_file(graph, file):
     file.close()
 
 
-def read_graph_from_file(filename):
-    file = open(filename, "r")
-    line = file.readline()
-    line = line.strip()
-    vertices, edges = line.split(' ')
-    graph = TripleDictGraph(int(vertices), int(edges))
-    line = file.readline().strip()
-    while len(line) > 0:
-        line = line.split(' ')
-        if len(line) == 1:
-            graph.dictionary_in[int(line[0])] = []
-            graph.dictionary_out[int(line[0])] = []
-        elif len(line) == 3:
-            graph.dictionary_in[int(line[1])].append(int(line[0]))
-            graph.dictionary_out[int(line[0])].append(int(line[1]))
-            graph.dictionary_cost[(int(line[0]), int(line[1]))] = int(line[2])
-        line = file.readline().strip()
-    file.close()
+def _read_lines(file, dictionary_in, dictionary_out, dictionary_cost, chunk_size):
+    """
+    Parses "x y cost" edge lines and "x" isolated vertex lines into the three dictionaries in a single pass, reading
+    the file chunk_size characters at a time. Vertices are created the first time they appear, and a repeated edge only
+    updates its cost. Like the original loaders, parsing stops at the first empty line.
+    :return: the number of lines read
+    """
+    lines = 0
+    chunk = file.readlines(chunk_size)
+    while chunk:
+        for line in chunk:
+            fields = line.split()
+            if len(fields) == 3:
+                x, y, cost = map(int, fields)
+                if x not in dictionary_out:
+                    dictionary_in[x] = []
+                    dictionary_out[x] = []
+                if y not in dictionary_in:
+                    dictionary_in[y] = []
+                    dictionary_out[y] = []
+                if (x, y) not in dictionary_cost:
+                    dictionary_in[y].append(x)
+                    dictionary_out[x].append(y)
+                dictionary_cost[(x, y)] = cost
+            elif len(fields) == 1:
+                vertex = int(fields[0])
+                if vertex not in dictionary_in:
+                    dictionary_in[vertex] = []
+                    dictionary_out[vertex] = []
+            elif not fields:
+                return lines
+            lines += 1
+        chunk = file.readlines(chunk_size)
+    return lines
+
+
+def _report(statistics, lines, graph, start):
+    if statistics is not None:
+        seconds = time.perf_counter() - start
+        statistics["lines"] = lines
+        statistics["vertices"] = len(graph.dictionary_in)
+        statistics["edges"] = len(graph.dictionary_cost)
+        statistics["seconds"] = seconds
+        statistics["edges_per_second"] = len(graph.dictionary_cost) / seconds if seconds else float('inf')
+
+
+def read_graph_from_file(filename, chunk_size=1 << 20, statistics=None):
+    """
+    Reads a graph written by write_graph_to_file: a "vertices edges" header followed by edge and vertex lines.
+    :param filename: the file to read
+    :param chunk_size: the number of characters read at once
+    :param statistics: if given, a dictionary that receives the number of lines, vertices and edges read, the seconds
+    spent and the edges loaded per second
+    :return: the TripleDictGraph
+    """
+    start = time.perf_counter()
+    with open(filename, "r") as file:
+        vertices, edges = file.readline().split()
+        graph = TripleDictGraph(int(vertices), int(edges))
+        lines = _read_lines(file, graph.dictionary_in, graph.dictionary_out, graph.dictionary_cost, chunk_size)
+    _report(statistics, lines, graph, start)
     return graph
 
 
-def read_modified_graph_from_file(filename):
-    file = open(filename, "r")
-    line = file.readline().strip()
+def read_modified_graph_from_file(filename, chunk_size=1 << 20, statistics=None):
+    """
+    Reads a graph written by write_modified_graph_to_file: edge and vertex lines without a header.
+    :param filename: the file to read
+    :param chunk_size: the number of characters read at once
+    :param statistics: if given, a dictionary that receives the number of lines, vertices and edges read, the seconds
+    spent and the edges loaded per second
+    :return: the TripleDictGraph
+    """
+    start = time.perf_counter()
     dictionary_in = {}
     dictionary_out = {}
     dictionary_cost = {}
-    vertices, edges = 0, 0
-    while len(line) > 0:
-        line = line.split(' ')
-        if len(line) == 1:
-            dictionary_in[int(line[0])] = []
-            dictionary_out[int(line[0])] = []
-        elif len(line) == 3:
-            dictionary_in[int(line[0])] = []
-            dictionary_out[int(line[0])] = []
-            dictionary_in[int(line[1])] = []
-            dictionary_out[int(line[1])] = []
-            edges += 1
-            dictionary_in[int(line[1])].append(int(line[0]))
-            dictionary_out[int(line[0])].append(int(line[1]))
-            dictionary_cost[(int(line[0]), int(line[1]))] = int(line[2])
-        line = file.readline().strip()
-    for key in dictionary_in.keys():
-        vertices += 1
-    graph = TripleDictGraph(int(vertices), int(edges))
+    with open(filename, "r") as file:
+        lines = _read_lines(file, dictionary_in, dictionary_out, dictionary_cost, chunk_size)
+    graph = TripleDictGraph(len(dictionary_in), len(dictionary_cost))
     graph.set_dictionary_cost(dictionary_cost)
     graph.set_dictionary_in(dictionary_in)
     graph.set_dictionary_out(dictionary_out)
-    file.close()
-    return graph
\ No newline at end of file
+    _report(statistics, lines, graph, start)
+    return graph
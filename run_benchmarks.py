@@ -0,0 +1,235 @@
+"""
+Non-interactive benchmark runner for the three graph implementations of the repository:
+
+    A1  A1-Graph-Algo/graph.py                     Graph
+    A3  GA-A3-Botezatu Ioana/.../graph.py          TripleDictGraph (the A2 class plus find_minimum_cost_walk)
+    A4  A4-Graph-Algo/directed_graph.py            DirectedGraph
+
+Every (implementation, dataset) pair runs in its own worker process, because the implementations use clashing module
+names (graph, external_functions) and so that the peak memory of one run does not leak into the next. Each operation is
+timed several times (the best time is kept) and then run once more under tracemalloc to record its peak allocation.
+
+Usage:
+    python run_benchmarks.py [--datasets FILE ...] [--implementations A1 A3 A4] [--repeats N]
+                             [--json report.json] [--csv report.csv] [--no-memory]
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+IMPLEMENTATIONS = {
+    "A1": os.path.join(ROOT, "A1-Graph-Algo"),
+    "A3": os.path.join(ROOT, "GA-A3-Botezatu Ioana", "GA-A2-Botezatu Ioana", "GA-A2-Botezatu Ioana"),
+    "A4": os.path.join(ROOT, "A4-Graph-Algo"),
+}
+
+DATASETS = [
+    os.path.join(ROOT, "GA-A2-Botezatu Ioana", "graph1k.txt"),
+    os.path.join(ROOT, "GA-A2-Botezatu Ioana", "graph10k.txt"),
+]
+
+# operations whose running time grows too fast to run above the given number of vertices (without NumPy, the walk DP
+# takes minutes on graph10k)
+VERTEX_LIMITS = {
+    ("A4", "lowest_cost_walk"): 2000,
+}
+
+FIELDS = ["implementation", "dataset", "vertices", "edges", "operation", "status", "seconds", "edges_per_second",
+          "peak_memory_bytes", "peak_rss_kb"]
+
+
+def _missing_edge(has_edge, vertices):
+    for x in vertices:
+        for y in vertices:
+            if not has_edge(x, y):
+                return x, y
+    return None
+
+
+def _a1_operations(path):
+    from external_functions import readGraph
+    from graph import Graph
+
+    graph = readGraph(path)
+    n = graph.NumberOfVertices
+    x, y = _missing_edge(lambda a, b: graph.findEdgeBetweenVertices(a, b) is not None, range(n))
+    operations = [
+        ("add_edge", lambda: graph.addEdge(x, y, 1)),
+        ("remove_edge", lambda: graph.removeEdge(x, y)),
+        ("add_vertex", lambda: graph.addVertex(n)),
+        ("remove_vertex", lambda: graph.removeVertex(n)),
+        ("degrees", lambda: [(graph.inDegree(v), graph.outDegree(v)) for v in range(n)]),
+        ("copy", lambda: Graph.copyGraph(graph)),
+    ]
+    return (lambda: readGraph(path)), n, graph.NumberOfEdges, operations
+
+
+def _a3_operations(path):
+    from graph import read_graph_from_file
+
+    graph = read_graph_from_file(path)
+    n = graph.number_of_vertices
+    x, y = _missing_edge(lambda a, b: (a, b) in graph.dictionary_cost, range(n))
+    operations = [
+        ("add_edge", lambda: graph.add_edge(x, y, 1)),
+        ("remove_edge", lambda: graph.remove_edge(x, y)),
+        ("add_vertex", lambda: graph.add_vertex(n)),
+        ("remove_vertex", lambda: graph.remove_vertex(n)),
+        ("degrees", lambda: [(graph.in_degree(v), graph.out_degree(v)) for v in range(n)]),
+        ("copy", lambda: graph.make_copy()),
+        ("bfs_path", lambda: graph.find_lowest_length_path(0, n - 1)),
+        ("bellman_ford", lambda: graph.find_minimum_cost_walk(0, n - 1)),
+    ]
+    return (lambda: read_graph_from_file(path)), n, graph.number_of_edges, operations
+
+
+def _a4_operations(path):
+    from external_functions import read_graph, negative_cycle_detection, lowest_cost_walk_dp
+
+    graph = read_graph(path)
+    n = graph.get_number_of_vertices()
+    x, y = _missing_edge(lambda a, b: (a, b) in graph.costs, [str(v) for v in range(n)])
+    operations = [
+        ("add_edge", lambda: graph.add_edge(x, y, 1)),
+        ("remove_edge", lambda: graph.remove_edge(x, y)),
+        ("add_vertex", lambda: graph.add_vertex(str(n))),
+        ("remove_vertex", lambda: graph.remove_vertex(str(n))),
+        ("degrees", lambda: [(graph.in_degree(v), graph.out_degree(v)) for v in graph.parse_vertices()]),
+        ("copy", lambda: graph.copy()),
+        ("bellman_ford", lambda: negative_cycle_detection(graph, "0")),
+        ("lowest_cost_walk", lambda: lowest_cost_walk_dp(graph, 0, n - 1)),
+        ("topological_sort", lambda: graph.topological_sorting()),
+    ]
+    return (lambda: read_graph(path)), n, graph.get_number_of_edges(), operations
+
+
+ADAPTERS = {"A1": _a1_operations, "A3": _a3_operations, "A4": _a4_operations}
+
+
+def run_worker(implementation, dataset, repeats, memory):
+    """
+    Runs every operation of one implementation on one dataset (inside the worker process) and returns the rows.
+    The whole sequence of operations is repeated, so that paired operations (add/remove edge, add/remove vertex)
+    always find the graph in the state they expect; the last pass runs under tracemalloc when memory is measured.
+    """
+    sys.path.insert(0, IMPLEMENTATIONS[implementation])
+    load, vertices, edges, operations = ADAPTERS[implementation](dataset)
+    base = {"implementation": implementation, "dataset": os.path.basename(dataset), "vertices": vertices,
+            "edges": edges}
+
+    statuses = {}
+    runnable = []
+    for name, function in [("load", load)] + operations:
+        limit = VERTEX_LIMITS.get((implementation, name))
+        if limit is not None and vertices > limit:
+            statuses[name] = "skipped: more than {} vertices".format(limit)
+        else:
+            runnable.append((name, function))
+
+    seconds = {}
+    peaks = {}
+    for repeat in range(repeats + 1 if memory else repeats):
+        tracing = repeat == repeats
+        for name, function in runnable:
+            if name in statuses:
+                continue
+            if tracing:
+                tracemalloc.start()
+            start = time.perf_counter()
+            try:
+                function()
+            except Exception as error:
+                statuses[name] = "error: {}: {}".format(type(error).__name__, error)
+            elapsed = time.perf_counter() - start
+            if tracing:
+                peaks[name] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            elif name not in seconds or elapsed < seconds[name]:
+                seconds[name] = elapsed
+
+    rows = []
+    for name, function in [("load", load)] + operations:
+        row = dict(base, operation=name, status=statuses.get(name, "ok"))
+        if name not in statuses:
+            row.update(seconds=seconds[name], peak_memory_bytes=peaks.get(name))
+            if name == "load":
+                row["edges_per_second"] = edges / seconds[name]
+        rows.append(row)
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for row in rows:
+        row["peak_rss_kb"] = peak_rss
+    return rows
+
+
+def run(implementations, datasets, repeats, memory):
+    rows = []
+    for dataset in datasets:
+        for implementation in implementations:
+            command = [sys.executable, os.path.abspath(__file__), "--worker", implementation, dataset,
+                       "--repeats", str(repeats)]
+            if not memory:
+                command.append("--no-memory")
+            print("running {} on {}".format(implementation, os.path.basename(dataset)), file=sys.stderr)
+            result = subprocess.run(command, cwd=IMPLEMENTATIONS[implementation], capture_output=True, text=True)
+            if result.returncode != 0:
+                # a worker killed by a signal (the OOM killer, for instance) may leave nothing on stderr
+                lines = result.stderr.strip().splitlines()
+                status = "error: " + lines[-1] if lines else "error: exit code {}".format(result.returncode)
+                rows.append({"implementation": implementation, "dataset": os.path.basename(dataset),
+                             "operation": "worker", "status": status})
+                continue
+            rows.extend(json.loads(result.stdout))
+    return rows
+
+
+def write_csv(rows, file_path):
+    with open(file_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: row.get(field) for field in FIELDS})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the graph implementations of the repository.")
+    parser.add_argument("--datasets", nargs="+", default=DATASETS)
+    parser.add_argument("--implementations", nargs="+", default=list(IMPLEMENTATIONS), choices=list(IMPLEMENTATIONS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", help="write the report as JSON to this file")
+    parser.add_argument("--csv", help="write the report as CSV to this file")
+    parser.add_argument("--no-memory", action="store_true", help="do not measure the peak allocation of operations")
+    parser.add_argument("--worker", nargs=2, metavar=("IMPLEMENTATION", "DATASET"), help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.worker:
+        implementation, dataset = arguments.worker
+        print(json.dumps(run_worker(implementation, dataset, arguments.repeats, not arguments.no_memory)))
+        return
+
+    datasets = [os.path.abspath(dataset) for dataset in arguments.datasets]
+    rows = run(arguments.implementations, datasets, arguments.repeats, not arguments.no_memory)
+    report = {"python": platform.python_version(), "platform": platform.platform(), "repeats": arguments.repeats,
+              "results": rows}
+
+    if arguments.json:
+        with open(arguments.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if arguments.csv:
+        write_csv(rows, arguments.csv)
+    if not arguments.json and not arguments.csv:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()